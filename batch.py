@@ -0,0 +1,62 @@
+"""Vectorised heuristic evaluation of many positions at once.
+
+Positions are rows of an (M, cells) int8 array: 1 for 'O', -1 for 'X', 0 for
+an empty cell. Every winning line is precomputed as a row of cell indices, so
+scoring M positions is one fancy-indexing gather and a table lookup instead
+of M Python loops over the line masks. Needs NumPy, which the engine itself
+does not; ``AIEngine(batch_leaves=True)`` uses this module to score the
+children of every depth-1 node in one call.
+"""
+import numpy as np
+
+from engine import get_geometry
+
+O_MARK, X_MARK = 1, -1
+
+
+class BatchEvaluator:
+    def __init__(self, geometry):
+        self.geometry = geometry
+        cells = geometry.cells
+        # (lines, K) cell indices of every winning line
+        self.line_cells = np.array([[i for i in range(cells) if mask >> i & 1] for mask in geometry.win_masks],
+                                   dtype=np.intp)
+        self.line_scores = np.array(geometry.line_scores, dtype=np.int32)
+        self.width = geometry.win_length + 1
+        self.nbytes = (cells + 7) // 8
+
+    def evaluate(self, boards):
+        """Heuristic score of each row of an (M, cells) int8 array, as an (M,) int array."""
+        lines = np.asarray(boards, dtype=np.int8)[:, self.line_cells]
+        o_counts = (lines == O_MARK).sum(axis=2)
+        x_counts = (lines == X_MARK).sum(axis=2)
+        return self.line_scores[x_counts * self.width + o_counts].sum(axis=1)
+
+    def to_array(self, positions):
+        """(M, cells) int8 array from a sequence of (x_bits, o_bits) pairs."""
+        return self.unpack([x for x, _ in positions]) * np.int8(X_MARK) + self.unpack([o for _, o in positions])
+
+    def unpack(self, bitboards):
+        blob = b''.join(bits.to_bytes(self.nbytes, 'little') for bits in bitboards)
+        rows = np.frombuffer(blob, dtype=np.uint8).reshape(len(bitboards), self.nbytes)
+        return np.unpackbits(rows, axis=1, bitorder='little')[:, :self.geometry.cells].view(np.int8)
+
+    def evaluate_bits(self, positions):
+        """Scores of (x_bits, o_bits) pairs; equal to ``Geometry.evaluate_bits`` on each."""
+        return self.evaluate(self.to_array(positions))
+
+    def evaluate_boards(self, boards):
+        """Scores of list boards of 'X'/'O'/'' marks."""
+        marks = {'O': O_MARK, 'X': X_MARK}
+        return self.evaluate(np.array([[marks.get(mark, 0) for mark in board] for board in boards],
+                                      dtype=np.int8).reshape(len(boards), self.geometry.cells))
+
+
+_evaluators = {}
+
+
+def get_evaluator(size=3, win_length=3):
+    """Shared BatchEvaluator for a board shape."""
+    key = (size, win_length)
+    if key not in _evaluators: _evaluators[key] = BatchEvaluator(get_geometry(size, win_length))
+    return _evaluators[key]
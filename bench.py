@@ -0,0 +1,168 @@
+"""Reproducible AIEngine benchmark.
+
+Runs ``get_move`` on a fixed corpus of positions at every difficulty and
+records wall time, nodes, leaf evaluations, cutoffs, re-searches and peak
+memory. Searches use fixed depth, a cold transposition table and no
+tablebase, so node counts are identical from run to run:
+
+    python bench.py --out bench.json
+    python bench.py --baseline bench.json --threshold 0.15
+
+``--records games.jsonl`` benchmarks every position where an engine was to
+move in a file of recorded games (see gamerecord.py) instead of the corpus.
+
+With ``--baseline`` the exit status is 1 if any metric regressed by more than
+the threshold. Node counts are exact; on noisy machines gate on them alone
+with ``--metrics nodes``.
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from engine import AIEngine, get_geometry
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+METRICS = ('seconds', 'nodes', 'peak_bytes')
+
+# (name, phase, size, win length, board) with rows joined and '.' for empty.
+# Every position has O (the AI) to move and no winner yet.
+CORPUS = [
+    ('3x3-corner', 'opening', 3, 3, 'X........'),
+    ('3x3-center', 'opening', 3, 3, '....X....'),
+    ('3x3-edge', 'opening', 3, 3, '.X.......'),
+    ('3x3-fork-threat', 'midgame', 3, 3, 'X...O...X'),
+    ('3x3-adjacent', 'midgame', 3, 3, 'XO..X....'),
+    ('3x3-open', 'midgame', 3, 3, '.X.OX....'),
+    ('3x3-must-block', 'endgame', 3, 3, 'XOX.O.X..'),
+    ('3x3-last-choice', 'endgame', 3, 3, 'XOXXOO.X.'),
+    ('4x4-opening', 'opening', 4, 4, '.....X..........'),
+    ('4x4-midgame', 'midgame', 4, 4, '.....XO...X..O.X'),
+    ('5x5-opening', 'opening', 5, 4, '............X............'),
+    ('5x5-midgame', 'midgame', 5, 4, '......XO....XO....X......'),
+]
+
+
+def parse_board(text):
+    return ['' if c == '.' else c for c in text]
+
+
+def validate(name, size, win_length, text):
+    geometry = get_geometry(size, win_length)
+    board = parse_board(text)
+    if len(board) != geometry.cells: raise ValueError(f"{name}: expected {geometry.cells} cells")
+    if board.count('X') != board.count('O') + 1: raise ValueError(f"{name}: it is not O's turn")
+    if geometry.winner_bits(*geometry.to_bits(board)): raise ValueError(f"{name}: game is already over")
+    return board
+
+
+def _cold_engine(difficulty, size, win_length, tablebase, batch_leaves=False):
+    AIEngine.tables.pop((difficulty, size, win_length), None)
+    engine = AIEngine(difficulty, size, win_length, iterative=False, batch_leaves=batch_leaves)
+    engine.use_tablebase = tablebase
+    return engine
+
+
+def measure(board, difficulty, size, win_length, repeat=5, tablebase=False, min_time=0.05, batch_leaves=False):
+    """Best timing of at least ``repeat`` runs and ``min_time`` seconds, plus
+    counters and peak memory from one traced run.
+    """
+    best, runs, spent = float('inf'), 0, 0.0
+    gc.disable()  # a collection landing in one run is noise, not a regression
+    try:
+        while runs < repeat or spent < min_time:
+            engine = _cold_engine(difficulty, size, win_length, tablebase, batch_leaves)
+            start = time.perf_counter()
+            move = engine.get_move(list(board))
+            elapsed = time.perf_counter() - start
+            best, runs, spent = min(best, elapsed), runs + 1, spent + elapsed
+    finally:
+        gc.enable()
+    stats = engine.search_stats()
+    engine = _cold_engine(difficulty, size, win_length, tablebase, batch_leaves)
+    tracemalloc.start()
+    try:
+        engine.get_move(list(board))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'move': move, 'seconds': best, 'nodes': stats['nodes'], 'leaves': stats['leaves'],
+            'cutoffs': stats['cutoffs'], 'researches': stats['researches'], 'peak_bytes': peak}
+
+
+def run(difficulties=DIFFICULTIES, repeat=5, tablebase=False, corpus=CORPUS, batch_leaves=False):
+    results = []
+    for name, phase, size, win_length, text in corpus:
+        board = validate(name, size, win_length, text)
+        for difficulty in difficulties:
+            result = {'name': name, 'phase': phase, 'size': size, 'win_length': win_length,
+                      'difficulty': difficulty}
+            result.update(measure(board, difficulty, size, win_length, repeat, tablebase,
+                                  batch_leaves=batch_leaves))
+            results.append(result)
+    return {'python': sys.version.split()[0], 'tablebase': tablebase, 'batch_leaves': batch_leaves,
+            'results': results}
+
+
+def compare(current, baseline, threshold, metrics=METRICS):
+    """List of human-readable regressions of ``current`` against ``baseline``."""
+    base = {(r['name'], r['difficulty']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = base.get((result['name'], result['difficulty']))
+        if old is None: continue
+        for metric in metrics:
+            if old[metric] and result[metric] > old[metric] * (1 + threshold):
+                regressions.append(f"{result['name']} [{result['difficulty']}] {metric}: "
+                                   f"{old[metric]:g} -> {result[metric]:g} "
+                                   f"(+{result[metric] / old[metric] - 1:.0%})")
+    return regressions
+
+
+def format_results(report):
+    lines = [f"{'position':<18}{'level':<8}{'move':>5}{'ms':>10}{'nodes':>9}{'leaves':>9}"
+             f"{'cutoffs':>9}{'peak KB':>9}"]
+    for r in report['results']:
+        lines.append(f"{r['name']:<18}{r['difficulty']:<8}{r['move']:>5}{r['seconds'] * 1000:>10.2f}"
+                     f"{r['nodes']:>9}{r['leaves']:>9}{r['cutoffs']:>9}{r['peak_bytes'] / 1024:>9.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AIEngine benchmark suite")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, action='append',
+                        help="limit to one difficulty; may be repeated")
+    parser.add_argument('--repeat', type=int, default=5, help="minimum timing runs per position, best is kept")
+    parser.add_argument('--tablebase', action='store_true', help="let hard answer from the tablebase")
+    parser.add_argument('--batch-leaves', action='store_true', help="score leaves in NumPy batches")
+    parser.add_argument('--records', help="use the engine positions of a game record file as the corpus")
+    parser.add_argument('--out', help="write the results as JSON")
+    parser.add_argument('--baseline', help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument('--metrics', default=','.join(METRICS),
+                        help=f"comma-separated metrics to compare (default {','.join(METRICS)})")
+    args = parser.parse_args(argv)
+    corpus = CORPUS
+    if args.records:
+        from gamerecord import engine_positions, read_records
+        corpus = [(name, 'recorded', size, win_length, text)
+                  for name, size, win_length, text in engine_positions(read_records(args.records))]
+    report = run(args.difficulty or DIFFICULTIES, args.repeat, args.tablebase, corpus, args.batch_leaves)
+    print(format_results(report))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold, args.metrics.split(','))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions: return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
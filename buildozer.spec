@@ -6,9 +6,9 @@ package.domain = org.deekshith
 android.archs = arm64-v8a
 source.main = main.py
 source.dir = .
-source.include_exts = py,png,jpg,kv,atlas,dm
+source.include_exts = py,png,jpg,kv,atlas,dm,bin
 orientation = portrait
-requirements = python3,kivy,kivymd,markdown,materialyoucolor,exceptiongroup,asyncgui,asynckivy, numpy
+requirements = python3,sqlite3,kivy,kivymd,markdown,materialyoucolor,exceptiongroup,asyncgui,asynckivy, numpy
 fullscreen = 0
 version = 0.2
 android.permissions = INTERNET,WRITE_EXTERNAL_STORAGE,READ_EXTERNAL_STORAGE,MANAGE_EXTERNAL_STORAGE,READ_MEDIA_IMAGES,READ_MEDIA_VIDEO,READ_MEDIA_AUDIO
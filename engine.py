@@ -0,0 +1,613 @@
+"""Headless tic-tac-toe engine for N x N boards with K in a row to win.
+
+Positions are two integers used as bitboards, one per player; bit ``i`` is set
+when that player owns cell ``i`` (row-major, 0 is top-left). The AI plays 'O'
+and is the maximizing side. ``Geometry`` holds the precomputed masks and
+tables for one board shape; the module-level names are the classic 3x3 game.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def _line_score(x_count, o_count, win_length):
+    if o_count == win_length: return 100
+    if x_count == win_length: return -100
+    if x_count and o_count: return 0
+    count, sign = (o_count, 1) if o_count else (x_count, -1)
+    if count == win_length - 1: return 5 * sign
+    if count == win_length - 2 and win_length > 3: return sign  # gives longer lines a gradient
+    return 0
+
+
+def _symmetry_perms(size):
+    """The 8 rotations/reflections as lists where new cell i takes old cell perm[i]."""
+    cells = range(size * size)
+    rotate = [(size - 1 - i % size) * size + i // size for i in cells]
+    mirror = [i // size * size + size - 1 - i % size for i in cells]
+    perms, perm = [], list(cells)
+    for _ in range(4):
+        perm = [perm[j] for j in rotate]
+        perms.append(perm)
+        perms.append([perm[j] for j in mirror])
+    return perms
+
+
+class Geometry:
+    """Masks and lookup tables for an N x N board with K in a row to win."""
+    CHUNK = 9  # symmetry tables permute 9 bits per lookup
+    MAX_SYMMETRY_CELLS = 25  # beyond 5x5 the tables cost more than they save
+    MAX_FULL_WIDTH_CELLS = 16  # beyond 4x4 only cells next to a stone are searched
+
+    def __init__(self, size=3, win_length=3):
+        if not 2 <= win_length <= size:
+            raise ValueError(f"win length {win_length} does not fit a {size}x{size} board")
+        self.size, self.win_length = size, win_length
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.cell_bits = tuple(1 << i for i in range(self.cells))
+        self.win_masks = tuple(self._windows())
+        self.lines_through = tuple(tuple(m for m in self.win_masks if m & bit) for bit in self.cell_bits)
+        # line_scores[x_count * (K + 1) + o_count] is the heuristic value of one line.
+        self.line_scores = tuple(_line_score(x, o, win_length)
+                                 for x in range(win_length + 1) for o in range(win_length + 1))
+        self.neighbours = tuple(self._neighbourhood(i) for i in range(self.cells))
+        # Static move ordering: cells on more lines (center, then corners) first.
+        self.cell_priority = tuple(len(lines) for lines in self.lines_through)
+        self.symmetries = self._symmetry_tables() if self.cells <= self.MAX_SYMMETRY_CELLS else None
+
+    def _windows(self):
+        n, k = self.size, self.win_length
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for r in range(n):
+                for c in range(n):
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if not (0 <= end_r < n and 0 <= end_c < n): continue
+                    yield sum(1 << (r + dr * s) * n + c + dc * s for s in range(k))
+
+    def _neighbourhood(self, cell):
+        n, r, c = self.size, cell // self.size, cell % self.size
+        return sum(1 << rr * n + cc for rr in range(max(r - 1, 0), min(r + 2, n))
+                   for cc in range(max(c - 1, 0), min(c + 2, n)))
+
+    def _symmetry_tables(self):
+        tables = []
+        chunks = range(0, self.cells, self.CHUNK)
+        for perm in _symmetry_perms(self.size):
+            target = [0] * self.cells
+            for new, old in enumerate(perm): target[old] = new
+            per_chunk = []
+            for start in chunks:
+                width = min(self.CHUNK, self.cells - start)
+                per_chunk.append(tuple(sum(1 << target[start + j] for j in range(width) if bits >> j & 1)
+                                       for bits in range(1 << width)))
+            tables.append(tuple(per_chunk))
+        return tuple(tables)
+
+    def to_bits(self, board):
+        """Convert a list of 'X'/'O'/'' marks into an (x_bits, o_bits) pair."""
+        x = o = 0
+        for i, mark in enumerate(board):
+            if mark == 'X': x |= self.cell_bits[i]
+            elif mark == 'O': o |= self.cell_bits[i]
+        return x, o
+
+    def is_win(self, bits):
+        for mask in self.win_masks:
+            if bits & mask == mask: return True
+        return False
+
+    def wins_at(self, bits, cell):
+        """Whether ``bits`` completes a line through ``cell``; only those lines are scanned."""
+        for mask in self.lines_through[cell]:
+            if bits & mask == mask: return True
+        return False
+
+    def winner_bits(self, x, o):
+        if self.is_win(o): return 'O'
+        if self.is_win(x): return 'X'
+        return None
+
+    def evaluate_bits(self, x, o):
+        scores, width = self.line_scores, self.win_length + 1
+        score = 0
+        for mask in self.win_masks:
+            score += scores[(x & mask).bit_count() * width + (o & mask).bit_count()]
+        return score
+
+    def empty_cells(self, x, o):
+        free = self.full & ~(x | o)
+        return [i for i in range(self.cells) if free & self.cell_bits[i]]
+
+    def candidate_cells(self, x, o):
+        """Cells worth searching: every empty cell on small boards, else those next to a stone."""
+        occupied = x | o
+        if self.cells <= self.MAX_FULL_WIDTH_CELLS: return self.empty_cells(x, o)
+        if not occupied: return [self.cells // 2]
+        near = 0
+        for i in range(self.cells):
+            if occupied >> i & 1: near |= self.neighbours[i]
+        near &= ~occupied
+        return [i for i in range(self.cells) if near >> i & 1]
+
+    def canonical_key(self, x, o, is_max):
+        """Smallest encoding of the position over the 8 rotations and reflections."""
+        cells = self.cells
+        if self.symmetries is None: return ((x << cells) | o) << 1 | is_max
+        if cells <= self.CHUNK:
+            key = min((sym[0][x] << cells) | sym[0][o] for sym in self.symmetries)
+            return key << 1 | is_max
+        mask, key = (1 << self.CHUNK) - 1, None
+        for sym in self.symmetries:
+            tx = to = shift = 0
+            for table in sym:
+                tx |= table[x >> shift & mask]
+                to |= table[o >> shift & mask]
+                shift += self.CHUNK
+            candidate = (tx << cells) | to
+            if key is None or candidate < key: key = candidate
+        return key << 1 | is_max
+
+
+_geometries = {}
+
+
+def get_geometry(size=3, win_length=3):
+    """Shared Geometry for a board shape; building the tables is not free."""
+    key = (size, win_length)
+    if key not in _geometries: _geometries[key] = Geometry(size, win_length)
+    return _geometries[key]
+
+
+DEFAULT_GEOMETRY = get_geometry(3, 3)
+FULL = DEFAULT_GEOMETRY.full
+WIN_MASKS = DEFAULT_GEOMETRY.win_masks
+CELL_BITS = DEFAULT_GEOMETRY.cell_bits
+to_bits = DEFAULT_GEOMETRY.to_bits
+is_win = DEFAULT_GEOMETRY.is_win
+winner_bits = DEFAULT_GEOMETRY.winner_bits
+evaluate_bits = DEFAULT_GEOMETRY.evaluate_bits
+empty_cells = DEFAULT_GEOMETRY.empty_cells
+
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """Bounded LRU map from canonical position keys to (depth, flag, value)."""
+
+    def __init__(self, capacity=50000):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    def lookup(self, key, depth):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < depth:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, flag, value):
+        entries = self.entries
+        old = entries.get(key)
+        if old is not None:
+            if old[0] > depth: return
+            entries.move_to_end(key)
+        elif len(entries) >= self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[key] = (depth, flag, value)
+        self.stores += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    def stats(self):
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'stores': self.stores, 'evictions': self.evictions}
+
+
+def hint_rank(entry):
+    """Sort key for an analysis entry: quick wins, then draws and open
+    positions by score, then losses that take longest.
+    """
+    result, distance, score = entry
+    if result == 'win': return 2, -distance
+    if result == 'loss': return 0, distance
+    return 1, score
+
+
+class SearchCancelled(Exception):
+    """Raised out of a search whose cancel event was set."""
+
+
+class _OutOfTime(Exception):
+    """Unwinds an iterative-deepening iteration that ran past its deadline."""
+
+
+class AIEngine:
+    # Searches may run on worker threads; the shared tables are not
+    # thread-safe, so only one search runs at a time.
+    search_lock = threading.Lock()
+    # One table per difficulty and board shape, shared by every engine in the
+    # session, so a deeper "hard" result never leaks into an "easy" game.
+    tables = {}
+    # Fixed-depth searches past 3x3 explode; these keep a move under a few seconds.
+    large_board_depths = {'easy': 1, 'medium': 2, 'hard': 3}
+    # Wall-clock seconds per move for iterative deepening.
+    time_budgets = {'easy': 0.25, 'medium': 0.75, 'hard': 2.0}
+    CLOCK_CHECK_MASK = 255  # look at the clock every 256 nodes
+    # Finished analyses by (size, win length, x, o, player), most recent last.
+    analyses = OrderedDict()
+    analysis_lock = threading.Lock()
+    ANALYSIS_CACHE_SIZE = 256
+
+    def __init__(self, difficulty='medium', size=3, win_length=3, iterative=True, batch_leaves=False):
+        """With ``iterative`` the search deepens until the difficulty's time
+        budget runs out; on 3x3 the fixed depth still caps it so easier
+        levels keep their blind spots. Without it the fixed depth is used.
+        ``batch_leaves`` scores the leaves under each depth-1 node in one
+        NumPy call (see batch.py); it pays off on boards with many lines.
+        """
+        self.geometry = get_geometry(size, win_length)
+        self.depths = {'easy': 2, 'medium': 4, 'hard': 6}
+        if self.geometry.cells > 9: self.depths = dict(self.large_board_depths)
+        self.depth = self.depths[difficulty]
+        self.iterative = iterative
+        self.time_budget = self.time_budgets[difficulty]
+        self.max_depth = self.depth if self.geometry.cells <= 9 else self.geometry.cells
+        self.table_key = (difficulty, size, win_length)
+        if self.table_key not in AIEngine.tables:
+            AIEngine.tables[self.table_key] = TranspositionTable()
+        self.table = AIEngine.tables[self.table_key]
+        self.use_tablebase = difficulty == 'hard' and self.geometry is DEFAULT_GEOMETRY
+        self.batch = None
+        self.pondered = {}  # (x, o) -> (reply, completed depth, stopped at), filled by ponder()
+        self.node_limit = None  # replays stop iterative deepening here instead of at the clock
+        if batch_leaves:
+            from batch import get_evaluator  # needs NumPy
+            self.batch = get_evaluator(size, win_length)
+        self.cancel = None
+        self.deadline = None
+        self.reset_counters()
+
+    def get_move(self, board, cancel=None):
+        """Pick a cell index for 'O' on a list board, or None if it is full.
+
+        ``cancel`` is an optional threading.Event; setting it from another
+        thread makes the search raise SearchCancelled. Positions already
+        searched by ``ponder`` are answered without searching.
+        """
+        return self.search(board, cancel)['move']
+
+    def search(self, board, cancel=None):
+        """``get_move`` as {'move', 'depth', 'nodes', 'pondered'}, all taken under the
+        search lock, so a search on another thread cannot replace them before the
+        caller reads them. ``nodes`` is the node count at which the clock stopped
+        the search, or None if it finished; with ``depth`` it is what a game
+        record needs to replay the move exactly.
+        """
+        x, o = self.geometry.to_bits(board)
+        with AIEngine.search_lock:
+            answer = self.pondered.get((x, o))
+            if answer is not None:
+                self.reset_counters()  # no search ran; report the pondered one
+                move, self.completed_depth, self.stopped_at = answer
+            else:
+                self.cancel = cancel
+                try:
+                    move = self.best_move(x, o)
+                finally:
+                    self.cancel = None
+            return {'move': move, 'depth': self.completed_depth, 'nodes': self.stopped_at,
+                    'pondered': answer is not None}
+
+    def new_game(self):
+        """Start from an empty transposition table, so each game's searches depend
+        only on its own moves and can be replayed from its record.
+        """
+        with AIEngine.search_lock:  # a cancelled search may still be unwinding
+            self.table = AIEngine.tables[self.table_key] = TranspositionTable()
+            self.pondered = {}
+
+    def ponder(self, board, cancel, limit=None):
+        """Search ahead while X is to move on ``board``: find the reply to each
+        of X's likely moves, most likely first, until ``cancel`` is set. Each
+        reply is searched under the lock on its own, so a real search waits
+        for at most one cancelled node, and on an empty private table, so it
+        leaves the game's table as it was.
+        """
+        geometry = self.geometry
+        x, o = geometry.to_bits(board)
+        self.pondered = pondered = {}
+        moves = self.order_moves(x, o, geometry.candidate_cells(x, o), False)
+        for pos in moves[:limit]:
+            child = x | geometry.cell_bits[pos]
+            if geometry.wins_at(child, pos) or child | o == geometry.full: continue
+            with AIEngine.search_lock:
+                if cancel.is_set(): return
+                self.cancel = cancel
+                shared_table, self.table = self.table, TranspositionTable()
+                try:
+                    pondered[(child, o)] = (self.best_move(child, o), self.completed_depth, self.stopped_at)
+                except SearchCancelled:
+                    return
+                finally:
+                    self.cancel = None
+                    self.table = shared_table
+
+    def best_move(self, x, o, player='O'):
+        """Best cell for ``player``; for 'X' the search runs with the colours swapped."""
+        self.reset_counters()
+        if self.use_tablebase:
+            from tablebase import get_tablebase
+            tablebase = get_tablebase()
+            move = tablebase.best_move(x, o) if tablebase else None
+            if move is not None: return move
+        if player == 'X': x, o = o, x
+        moves = self.geometry.candidate_cells(x, o)
+        if not moves: return None
+        moves = self.order_moves(x, o, moves, True)
+        if not self.iterative:
+            self.completed_depth = self.depth
+            return self.search_root(x, o, moves, self.depth)[0]
+        return self.iterative_deepening(x, o, moves)
+
+    def analyse(self, board, player='X', cancel=None):
+        """Score every candidate cell for ``player`` on a list board.
+
+        Returns {cell: (result, distance, score)}. ``result`` is 'win', 'draw'
+        or 'loss' once the search proves it, with ``distance`` the plies to
+        that result counting the move itself; otherwise both are None and
+        only the heuristic ``score`` is known. Results are cached per position.
+        """
+        geometry = self.geometry
+        x, o = geometry.to_bits(board)
+        key = (geometry.size, geometry.win_length, x, o, player)
+        with AIEngine.analysis_lock:
+            if key in AIEngine.analyses:
+                AIEngine.analyses.move_to_end(key)
+                return AIEngine.analyses[key]
+        with AIEngine.search_lock:
+            self.cancel = cancel
+            try:
+                analysis = self.analyse_bits(x, o, player)
+            finally:
+                self.cancel = None
+        with AIEngine.analysis_lock:
+            AIEngine.analyses[key] = analysis
+            if len(AIEngine.analyses) > self.ANALYSIS_CACHE_SIZE: AIEngine.analyses.popitem(last=False)
+        return analysis
+
+    def analyse_bits(self, x, o, player='X'):
+        """Multi-PV search: every root move gets a full window, so each score is
+        exact rather than a bound, while the transposition table and move
+        ordering are shared across them. Deepens until the time budget runs
+        out or every move is proven.
+        """
+        self.reset_counters()
+        geometry = self.geometry
+        if player == 'X': x, o = o, x
+        if geometry.winner_bits(x, o): return {}
+        moves = self.order_moves(x, o, geometry.candidate_cells(x, o), True)
+        remaining = (geometry.full & ~(x | o)).bit_count()
+        exhaustive = geometry.cells <= geometry.MAX_FULL_WIDTH_CELLS
+        analysis = {}
+        # A private table: entries left by deeper searches of earlier positions
+        # would prove wins at too shallow a depth and understate distances.
+        shared_table, self.table = self.table, TranspositionTable()
+        self.deadline = time.monotonic() + self.time_budget
+        try:
+            for depth in range(remaining):
+                scores = {}
+                try:
+                    for pos in moves:
+                        result = analysis.get(pos, (None,))[0]
+                        if result in ('win', 'loss'): continue  # proven at a shallower depth
+                        scores[pos] = self.minimax(x, o | geometry.cell_bits[pos], depth, False,
+                                                   float('-inf'), float('inf'), pos)
+                except _OutOfTime:
+                    break
+                self.completed_depth = depth
+                for pos, score in scores.items():
+                    if score >= 100: analysis[pos] = ('win', depth + 1, score)
+                    elif score <= -100: analysis[pos] = ('loss', depth + 1, score)
+                    elif exhaustive and depth == remaining - 1: analysis[pos] = ('draw', remaining, score)
+                    else: analysis[pos] = (None, None, score)
+                if all(result in ('win', 'loss') for result, _, _ in analysis.values()): break
+                moves = sorted(moves, key=lambda pos: analysis[pos][2], reverse=True)
+        finally:
+            self.deadline = None
+            self.table = shared_table
+        return analysis
+
+    def reset_counters(self):
+        """Clear per-search ordering state and the node counters."""
+        self.completed_depth = None
+        self.stopped_at = None  # node count when the clock stopped iterative deepening
+        self.hash_moves = {}
+        self.killers = {}
+        self.history = [0] * self.geometry.cells
+        self.nodes = self.leaves = self.cutoffs = self.researches = 0
+
+    def search_stats(self):
+        return {'nodes': self.nodes, 'leaves': self.leaves, 'cutoffs': self.cutoffs,
+                'researches': self.researches, 'depth': self.completed_depth}
+
+    def order_moves(self, x, o, moves, is_max, hash_move=None):
+        """Immediate wins, the hash move, forced blocks, killers, then history and center/corners."""
+        geometry = self.geometry
+        cell_bits, wins_at = geometry.cell_bits, geometry.wins_at
+        priority, history = geometry.cell_priority, self.history
+        mover, opponent = (o, x) if is_max else (x, o)
+        killers = self.killers.get((x | o).bit_count(), ())
+
+        def rank(pos):
+            bit = cell_bits[pos]
+            if wins_at(mover | bit, pos): group = 4
+            elif pos == hash_move: group = 3
+            elif wins_at(opponent | bit, pos): group = 2
+            elif pos in killers: group = 1
+            else: group = 0
+            return group, history[pos], priority[pos]
+        return sorted(moves, key=rank, reverse=True)
+
+    def _record_cutoff(self, x, o, pos, depth):
+        self.cutoffs += 1
+        self.history[pos] += depth * depth
+        ply = (x | o).bit_count()
+        killers = self.killers.get(ply)
+        if killers is None: self.killers[ply] = [pos]
+        elif pos not in killers: self.killers[ply] = [pos, killers[0]]
+
+    def iterative_deepening(self, x, o, moves):
+        """Search depth 0, 1, 2... until the budget runs out; keep the last finished answer."""
+        remaining = (self.geometry.full & ~(x | o)).bit_count()
+        best_move, self.completed_depth = moves[0], None
+        self.deadline = time.monotonic() + self.time_budget
+        try:
+            for depth in range(min(self.max_depth, remaining - 1) + 1):
+                try:
+                    best_move, score = self.search_root(x, o, moves, depth)
+                except _OutOfTime:
+                    self.stopped_at = self.nodes
+                    break
+                self.completed_depth = depth
+                # The previous best goes first; hash_moves orders the nodes below it.
+                moves = [best_move] + [m for m in moves if m != best_move]
+                if abs(score) >= 100: break  # forced result, deeper cannot change it
+        finally:
+            self.deadline = None
+        return best_move
+
+    def search_root(self, x, o, moves, depth):
+        cell_bits = self.geometry.cell_bits
+        best_score, best_move, alpha, beta = float('-inf'), moves[0], float('-inf'), float('inf')
+        for i, pos in enumerate(moves):
+            child = o | cell_bits[pos]
+            if i == 0:
+                score = self.minimax(x, child, depth, False, alpha, beta, pos)
+            else:
+                score = self.minimax(x, child, depth, False, alpha, alpha + 1, pos)
+                if alpha < score < beta:
+                    self.researches += 1
+                    score = self.minimax(x, child, depth, False, alpha, beta, pos)
+            if score > best_score:
+                best_score, best_move = score, pos
+            alpha = max(alpha, best_score)
+            if beta <= alpha: break
+        return best_move, best_score
+
+    def minimax(self, x, o, depth, is_max, alpha, beta, last=None):
+        """Score the position after a move to ``last`` by the side not to move."""
+        if self.cancel is not None and self.cancel.is_set(): raise SearchCancelled
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & self.CLOCK_CHECK_MASK and (
+                self.nodes == self.node_limit or time.monotonic() > self.deadline): raise _OutOfTime
+        geometry = self.geometry
+        if last is None:
+            winner = geometry.winner_bits(x, o)
+            if winner: return 100 if winner == 'O' else -100
+        elif is_max:
+            if geometry.wins_at(x, last): return -100
+        elif geometry.wins_at(o, last): return 100
+        occupied = x | o
+        if depth == 0 or occupied == geometry.full:
+            self.leaves += 1
+            return geometry.evaluate_bits(x, o)
+        key = geometry.canonical_key(x, o, is_max)
+        entry = self.table.lookup(key, depth)
+        if entry is not None:
+            _, flag, value = entry
+            if flag == EXACT: return value
+            if flag == LOWER:
+                if value > alpha: alpha = value
+            elif value < beta: beta = value
+            if beta <= alpha: return value
+        position = (x << geometry.cells) | o
+        if depth == 1 and self.batch is not None:
+            best, self.hash_moves[position] = self._batch_frontier(x, o, is_max)
+            self.table.store(key, depth, EXACT, best)
+            return best
+        window_alpha, window_beta = alpha, beta
+        cell_bits = geometry.cell_bits
+        moves = self.order_moves(x, o, geometry.candidate_cells(x, o), is_max, self.hash_moves.get(position))
+        best_pos = moves[0]
+        # Principal variation search: the first move gets the full window, the
+        # rest a null window that is only widened when they might beat it.
+        if is_max:
+            best = float('-inf')
+            for i, pos in enumerate(moves):
+                child = o | cell_bits[pos]
+                if i == 0:
+                    score = self.minimax(x, child, depth - 1, False, alpha, beta, pos)
+                else:
+                    score = self.minimax(x, child, depth - 1, False, alpha, alpha + 1, pos)
+                    if alpha < score < beta:
+                        self.researches += 1
+                        score = self.minimax(x, child, depth - 1, False, alpha, beta, pos)
+                if score > best: best, best_pos = score, pos
+                if best > alpha: alpha = best
+                if beta <= alpha:
+                    self._record_cutoff(x, o, pos, depth)
+                    break
+        else:
+            best = float('inf')
+            for i, pos in enumerate(moves):
+                child = x | cell_bits[pos]
+                if i == 0:
+                    score = self.minimax(child, o, depth - 1, True, alpha, beta, pos)
+                else:
+                    score = self.minimax(child, o, depth - 1, True, beta - 1, beta, pos)
+                    if alpha < score < beta:
+                        self.researches += 1
+                        score = self.minimax(child, o, depth - 1, True, alpha, beta, pos)
+                if score < best: best, best_pos = score, pos
+                if best < beta: beta = best
+                if beta <= alpha:
+                    self._record_cutoff(x, o, pos, depth)
+                    break
+        self.hash_moves[position] = best_pos
+        if best <= window_alpha: flag = UPPER
+        elif best >= window_beta: flag = LOWER
+        else: flag = EXACT
+        self.table.store(key, depth, flag, best)
+        return best
+
+    def hint(self, board, player='X', cancel=None):
+        """The cell ``analyse`` rates best for ``player``, or None if there is none."""
+        analysis = self.analyse(board, player, cancel)
+        return max(analysis, key=lambda cell: hint_rank(analysis[cell]), default=None)
+
+    def _batch_frontier(self, x, o, is_max):
+        """Exact (value, move) of a depth-1 node: an immediate win if there is
+        one, otherwise the best of all children scored in a single batch.
+        """
+        geometry = self.geometry
+        cell_bits, wins_at = geometry.cell_bits, geometry.wins_at
+        moves = geometry.candidate_cells(x, o)
+        children = []
+        for pos in moves:
+            self.nodes += 1
+            if is_max:
+                child = o | cell_bits[pos]
+                if wins_at(child, pos): return 100, pos
+                children.append((x, child))
+            else:
+                child = x | cell_bits[pos]
+                if wins_at(child, pos): return -100, pos
+                children.append((child, o))
+        self.leaves += len(children)
+        scores = self.batch.evaluate_bits(children)
+        i = int(scores.argmax() if is_max else scores.argmin())
+        return int(scores[i]), moves[i]
+
+    def evaluate_board(self, board):
+        return self.geometry.evaluate_bits(*self.geometry.to_bits(board))
+
+    def check_winner(self, board):
+        return self.geometry.winner_bits(*self.geometry.to_bits(board))
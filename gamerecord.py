@@ -0,0 +1,236 @@
+"""Versioned game records, streamed to and from JSON Lines files.
+
+A record file starts with a header line naming the format and version,
+followed by one compact JSON object per game:
+
+    {"format": "tictactoe-records", "version": 1}
+    {"size": 3, "win": 3, "x": "human", "o": "hard", "iterative": true,
+     "moves": [4, 0, 8, 2, 1, 7, 6, 5, 3], "depths": [null, 6, ...],
+     "nodes": [null, 512, ...], "pondered": [3], "result": "draw", ...}
+
+``x`` and ``o`` are 'human', 'random' or an AIEngine difficulty; ``depths``
+holds, for each engine move, the depth its search completed (null for other
+moves and for tablebase answers), or is null when it was not recorded.
+``nodes`` holds the node count at which the clock stopped each iterative
+search (null when it finished on its own), and ``pondered`` the plies whose
+move was searched ahead on a private table while the player was thinking.
+
+The replayer re-runs every engine move the way the game did, starting from
+a cold transposition table as the app does for each game: iterative searches
+stop at the recorded node count instead of the clock, so an interrupted
+depth leaves the same table entries behind for later moves, and fixed-depth
+searches run at the recorded depth. Any difference then means the engine
+changed. Records written before node counts were kept replay iterative
+moves up to the recorded depth, which is exact on 3x3 only; records without
+depths cannot be replayed.
+
+    python gamerecord.py export game_history.db games.jsonl
+    python gamerecord.py import games.jsonl game_history.db
+    python gamerecord.py replay games.jsonl
+"""
+import argparse
+import json
+import sys
+import time
+
+from engine import AIEngine, TranspositionTable, get_geometry
+
+FORMAT = 'tictactoe-records'
+VERSION = 1
+ENGINES = ('easy', 'medium', 'hard')
+PLAYERS = ('human', 'random') + ENGINES
+RESULTS = ('X', 'O', 'draw')
+
+
+class RecordError(ValueError):
+    """A record file or record that does not follow the format."""
+
+
+def make_record(size, win_length, moves, result, x='human', o='human', depths=None, iterative=True,
+                played_at=None, duration=None, nodes=None, pondered=()):
+    return {'size': size, 'win': win_length, 'x': x, 'o': o, 'iterative': iterative,
+            'moves': list(moves), 'depths': list(depths) if depths is not None else None,
+            'nodes': list(nodes) if nodes is not None else None, 'pondered': list(pondered),
+            'result': result, 'played_at': time.time() if played_at is None else played_at,
+            'duration': duration}
+
+
+def validate(record):
+    """Raise RecordError unless ``record`` is a legal, finished game."""
+    for key in ('size', 'win', 'x', 'o', 'moves', 'result'):
+        if key not in record: raise RecordError(f"missing '{key}'")
+    if record['x'] not in PLAYERS or record['o'] not in PLAYERS: raise RecordError("unknown player")
+    if record['result'] not in RESULTS: raise RecordError(f"unknown result {record['result']!r}")
+    try:
+        geometry = get_geometry(record['size'], record['win'])
+    except ValueError as e:
+        raise RecordError(str(e)) from None
+    moves, depths = record['moves'], record.get('depths')
+    if depths is not None and len(depths) != len(moves): raise RecordError("depths do not match moves")
+    nodes = record.get('nodes')
+    if nodes is not None and len(nodes) != len(moves): raise RecordError("nodes do not match moves")
+    if any(type(ply) is not int or not 0 <= ply < len(moves) for ply in record.get('pondered') or ()):
+        raise RecordError("pondered plies are not moves of the game")
+    x = o = 0
+    winner = None
+    for ply, move in enumerate(moves):
+        if winner is not None: raise RecordError(f"move {ply} played after the game was won")
+        if type(move) is not int or not 0 <= move < geometry.cells: raise RecordError(f"move {ply} is off the board")
+        bit = geometry.cell_bits[move]
+        if (x | o) & bit: raise RecordError(f"move {ply} plays an occupied cell")
+        if ply % 2 == 0: x |= bit
+        else: o |= bit
+        if geometry.wins_at(x if ply % 2 == 0 else o, move): winner = 'X' if ply % 2 == 0 else 'O'
+    result = winner or ('draw' if x | o == geometry.full else None)
+    if result != record['result']:
+        raise RecordError(f"moves end in {result or 'an unfinished game'}, record says {record['result']}")
+
+
+def write_records(path, records, append=False):
+    """Write records one line at a time; the header goes first into a new or empty file."""
+    count = 0
+    with open(path, 'a' if append else 'w') as f:
+        if f.tell() == 0: f.write(json.dumps({'format': FORMAT, 'version': VERSION}) + '\n')
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            count += 1
+    return count
+
+
+def read_records(path, check=True):
+    """Yield the records in ``path`` one at a time, validating each unless ``check`` is False."""
+    with open(path) as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get('format') != FORMAT:
+            raise RecordError(f"{path}: not a {FORMAT} file")
+        if header.get('version', 0) > VERSION:
+            raise RecordError(f"{path}: version {header['version']} is newer than {VERSION}")
+        for line_number, line in enumerate(f, 2):
+            if not line.strip(): continue
+            try:
+                record = json.loads(line)
+                if check: validate(record)
+            except (ValueError, TypeError) as e:
+                raise RecordError(f"{path}:{line_number}: {e}") from None
+            yield record
+
+
+def replay(record):
+    """Re-run the engine moves of a valid record; returns the divergences as
+    [{'ply', 'side', 'recorded', 'replayed'}], empty when the engine agrees.
+    Raises RecordError if the record has engine moves but no depths.
+    """
+    size, win_length = record['size'], record['win']
+    geometry = get_geometry(size, win_length)
+    depths, nodes = record.get('depths'), record.get('nodes')
+    pondered = set(record.get('pondered') or ())
+    iterative = record.get('iterative', True)
+    engines = {}
+    for side in ('X', 'O'):
+        spec = record[side.lower()]
+        if spec not in ENGINES: continue
+        if depths is None: raise RecordError("no search depths recorded, so the engine moves cannot be replayed")
+        AIEngine.tables.pop((spec, size, win_length), None)  # cold, like a fresh session
+        engine = engines[side] = AIEngine(spec, size, win_length, iterative=iterative)
+        engine.time_budget = float('inf')  # the recorded depth bounds the search, not the clock
+    x = o = 0
+    divergences = []
+    for ply, move in enumerate(record['moves']):
+        side = 'X' if ply % 2 == 0 else 'O'
+        engine = engines.get(side)
+        if engine is not None:
+            default_depth, default_max, shared_table = engine.depth, engine.max_depth, engine.table
+            if iterative and nodes is not None and nodes[ply] is not None:
+                engine.node_limit = nodes[ply]  # stops where the clock did
+            elif iterative:
+                # None is a tablebase answer or, in an old record, a search that finished no
+                # depth and so played the first ordered move; -1 deepens no further than that
+                engine.max_depth = -1 if depths[ply] is None else depths[ply]
+            elif depths[ply] is not None: engine.depth = depths[ply]
+            if ply in pondered: engine.table = TranspositionTable()
+            replayed = engine.best_move(x, o, side)
+            engine.depth, engine.max_depth, engine.table = default_depth, default_max, shared_table
+            engine.node_limit = None
+            if replayed != move:
+                divergences.append({'ply': ply, 'side': side, 'recorded': move, 'replayed': replayed})
+        if side == 'X': x |= geometry.cell_bits[move]
+        else: o |= geometry.cell_bits[move]
+    return divergences
+
+
+def from_history(history):
+    """Records for every game in a GameHistory, oldest first; the human is always X."""
+    for game in history.games(newest_first=False):
+        yield make_record(game['size'], game['win_length'], game['moves'], game['result'], 'human',
+                          game['difficulty'] if game['mode'] == 'ai' else 'human',
+                          played_at=game['played_at'], duration=game['duration'])
+
+
+def to_history(history, records):
+    """Append human-vs-AI and two-player records to a GameHistory; returns how many were added."""
+    count = 0
+    for record in records:
+        if record['x'] != 'human' or record['o'] not in ('human',) + ENGINES: continue
+        mode = 'pvp' if record['o'] == 'human' else 'ai'
+        history.append(mode, None if mode == 'pvp' else record['o'], record['size'], record['win'],
+                       record['moves'], record['result'], record.get('duration') or 0.0, record.get('played_at'))
+        count += 1
+    return count
+
+
+def engine_positions(records):
+    """(name, size, win length, board text) for every position where an engine
+    was to move as O, for use as a bench.py corpus.
+    """
+    for index, record in enumerate(records):
+        if record['o'] not in ENGINES: continue
+        board = ['.'] * (record['size'] * record['size'])
+        for ply, move in enumerate(record['moves']):
+            if ply % 2 == 1: yield f"record{index}-ply{ply}", record['size'], record['win'], ''.join(board)
+            board[move] = 'X' if ply % 2 == 0 else 'O'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Game record tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="write the game history as records")
+    export.add_argument('database')
+    export.add_argument('records')
+    load = commands.add_parser('import', help="append records to the game history")
+    load.add_argument('records')
+    load.add_argument('database')
+    check = commands.add_parser('replay', help="validate records and re-run their engine moves")
+    check.add_argument('records')
+    args = parser.parse_args(argv)
+    if args.command in ('export', 'import'):
+        from history import GameHistory
+        history = GameHistory(args.database)
+        try:
+            if args.command == 'export': count = write_records(args.records, from_history(history))
+            else: count = to_history(history, read_records(args.records))
+        finally:
+            history.close()
+        print(f"{args.command}ed {count} games")
+        return 0
+    games = diverged = skipped = 0
+    for index, record in enumerate(read_records(args.records)):
+        games += 1
+        try:
+            divergences = replay(record)
+        except RecordError as e:
+            print(f"game {index}: skipped, {e}")
+            skipped += 1
+            continue
+        if divergences: diverged += 1
+        for d in divergences:
+            print(f"game {index} ply {d['ply']} ({d['side']}, {record[d['side'].lower()]}): "
+                  f"recorded {d['recorded']}, engine now plays {d['replayed']}")
+    print(f"{games - skipped} games replayed, {diverged} diverged, {skipped} skipped")
+    return 1 if diverged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Append-only game history in SQLite.
+
+Every finished game is one row holding its mode, difficulty, board shape,
+move sequence (one byte per move), result, duration and timestamp. Rows are
+never updated or deleted. Indexes cover date, difficulty and result, and the
+``totals``/``daily`` tables are bumped in the same transaction as each insert,
+so summaries and trends never rescan the games table.
+
+Inserts run on a single background thread with their own connection. WAL
+mode lets reads proceed alongside them, and ``games`` streams rows from a
+cursor of its own rather than loading everything.
+"""
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    win_length INTEGER NOT NULL,
+    moves BLOB NOT NULL,
+    result TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_played_at ON games (played_at);
+CREATE INDEX IF NOT EXISTS games_difficulty ON games (difficulty, played_at);
+CREATE INDEX IF NOT EXISTS games_result ON games (result, played_at);
+CREATE TABLE IF NOT EXISTS totals (
+    difficulty TEXT NOT NULL,
+    result TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (difficulty, result)
+);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    result TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (day, difficulty, result)
+);
+"""
+# Two-player games have no difficulty; they are stored under this name.
+PVP = 'pvp'
+COLUMNS = ('id', 'played_at', 'mode', 'difficulty', 'size', 'win_length', 'moves', 'result', 'duration')
+
+
+class GameHistory:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)  # writer thread only
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.reader = sqlite3.connect(path, check_same_thread=False)
+        self.read_lock = threading.Lock()
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history')
+
+    def append(self, mode, difficulty, size, win_length, moves, result, duration, played_at=None):
+        """Queue one finished game for insertion; returns a Future of its row id."""
+        row = (time.time() if played_at is None else played_at, mode, difficulty or PVP,
+               size, win_length, bytes(moves), result, duration)
+        return self.writer.submit(self._insert, row)
+
+    def _insert(self, row):
+        played_at, _, difficulty, _, _, _, result, duration = row
+        day = time.strftime('%Y-%m-%d', time.localtime(played_at))
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO games (played_at, mode, difficulty, size, win_length, moves, result, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+            self.conn.execute(
+                "INSERT INTO totals VALUES (?, ?, 1, ?) ON CONFLICT (difficulty, result) "
+                "DO UPDATE SET games = games + 1, duration = duration + excluded.duration",
+                (difficulty, result, duration))
+            self.conn.execute(
+                "INSERT INTO daily VALUES (?, ?, ?, 1) ON CONFLICT (day, difficulty, result) "
+                "DO UPDATE SET games = games + 1", (day, difficulty, result))
+            return cursor.lastrowid
+
+    def games(self, mode=None, difficulty=None, result=None, since=None, until=None, limit=None, newest_first=True):
+        """Yield matching games as dicts, oldest or newest first, without materialising them all."""
+        clauses, params = [], []
+        if mode is not None: clauses.append("mode = ?"); params.append(mode)
+        if difficulty is not None: clauses.append("difficulty = ?"); params.append(difficulty)
+        if result is not None: clauses.append("result = ?"); params.append(result)
+        if since is not None: clauses.append("played_at >= ?"); params.append(since)
+        if until is not None: clauses.append("played_at < ?"); params.append(until)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM games"
+        if clauses: sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY played_at {'DESC' if newest_first else 'ASC'}"
+        if limit is not None: sql += f" LIMIT {int(limit)}"
+        conn = sqlite3.connect(self.path)  # private cursor, so a paused iteration blocks no one
+        try:
+            rows = conn.execute(sql, params)
+            while True:
+                batch = rows.fetchmany(256)
+                if not batch: return
+                for row in batch:
+                    game = dict(zip(COLUMNS, row))
+                    game['moves'] = list(game['moves'])
+                    yield game
+        finally:
+            conn.close()
+
+    def summary(self, difficulty=None):
+        """{result: {'games': n, 'duration': seconds}} for one difficulty or all of them."""
+        sql, params = "SELECT result, SUM(games), SUM(duration) FROM totals", []
+        if difficulty is not None: sql += " WHERE difficulty = ?"; params.append(difficulty)
+        with self.read_lock:
+            rows = self.reader.execute(sql + " GROUP BY result", params).fetchall()
+        return {result: {'games': games, 'duration': duration} for result, games, duration in rows}
+
+    def trend(self, difficulty, days=None):
+        """[(day, {result: games})] for ``difficulty``, oldest first, optionally the last ``days`` days."""
+        sql, params = "SELECT day, result, games FROM daily WHERE difficulty = ?", [difficulty]
+        if days is not None:
+            sql += " AND day >= ?"
+            params.append(time.strftime('%Y-%m-%d', time.localtime(time.time() - days * 86400)))
+        trend = {}
+        with self.read_lock:
+            for day, result, games in self.reader.execute(sql + " ORDER BY day", params):
+                trend.setdefault(day, {})[result] = games
+        return list(trend.items())
+
+    def close(self):
+        """Finish queued inserts and close the database."""
+        self.writer.shutdown(wait=True)
+        self.conn.close()
+        with self.read_lock:
+            self.reader.close()
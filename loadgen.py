@@ -0,0 +1,108 @@
+"""Load generator for server.py.
+
+Opens many concurrent connections, each playing games with random legal
+moves, and reports applied moves per second and move latency: the time from
+sending a move to receiving the state where it is the client's turn again,
+which includes the AI's reply in ``ai`` mode.
+
+    python loadgen.py --clients 1000 --games 5 --mode ai --difficulty easy
+    python loadgen.py --port 8765 --clients 200   # against a running server
+
+Without ``--port`` a server is started in this process on a free port.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+async def play(host, port, games, mode, difficulty, size, win_length, seed, latencies):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 16)
+    moves = 0
+
+    async def send(message):
+        writer.write((json.dumps(message) + '\n').encode())
+        await writer.drain()
+    try:
+        for _ in range(games):
+            await send({'op': 'new', 'mode': mode, 'difficulty': difficulty, 'size': size, 'win': win_length,
+                        'seat': 'both'})
+            game, sent = None, None
+            while True:
+                message = json.loads(await reader.readline())
+                if message['op'] == 'joined': game = message['game']
+                if message['op'] == 'error': raise RuntimeError(message['message'])
+                if message['op'] != 'state' or message['game'] != game: continue
+                if mode == 'ai' and message['turn'] == 'O' and message['result'] is None: continue
+                if sent is not None:
+                    latencies.append(time.perf_counter() - sent)
+                    sent = None
+                if message['result'] is not None: break
+                taken = set(message['moves'])
+                cell = rng.choice([c for c in range(size * size) if c not in taken])
+                sent = time.perf_counter()
+                await send({'op': 'move', 'game': game, 'cell': cell})
+                moves += 1
+    finally:
+        writer.close()
+    return moves
+
+
+async def run(host, port, clients, games, mode, difficulty, size, win_length, seed=0):
+    latencies = []
+    start = time.perf_counter()
+    sent = await asyncio.gather(*(play(host, port, games, mode, difficulty, size, win_length, seed + i, latencies)
+                                  for i in range(clients)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+    return {'clients': clients, 'games': clients * games, 'client_moves': sum(sent), 'wall_seconds': wall,
+            'moves_per_sec': sum(sent) / wall if wall else 0.0,
+            'p50_ms': percentile(0.5) * 1000, 'p99_ms': percentile(0.99) * 1000,
+            'max_ms': (latencies[-1] if latencies else 0.0) * 1000}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the game server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help="server to use; omit to start one in-process")
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--games', type=int, default=3, help="games per client")
+    parser.add_argument('--mode', choices=('ai', 'pvp'), default='ai')
+    parser.add_argument('--difficulty', default='easy')
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--win', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=4, help="AI threads for the in-process server")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    async def go():
+        port, server = args.port, None
+        if port is None:
+            from server import GameServer
+            server = GameServer(ThreadPoolExecutor(args.workers))
+            await server.start(args.host, 0)
+            port = server.port
+        try:
+            return await run(args.host, port, args.clients, args.games, args.mode, args.difficulty,
+                             args.size, args.win or args.size)
+        finally:
+            if server is not None:
+                server.server.close()
+                server.executor.shutdown()
+    report = asyncio.run(go())
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['clients']} clients, {report['games']} games in {report['wall_seconds']:.2f}s")
+        print(f"  {report['moves_per_sec']:.0f} client moves/s, latency p50 {report['p50_ms']:.1f} ms, "
+              f"p99 {report['p99_ms']:.1f} ms, max {report['max_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Bounded in-memory log with overflow spilled to disk.
+
+The newest ``capacity`` entries live in a ring buffer. Older ones are
+appended to a spill file, with the byte offset of each line kept, so any run
+of them can be read back with a single seek. ``rows`` is what a view shows:
+whatever has been paged back in from disk followed by the ring buffer.
+"""
+from collections import deque
+
+
+class LogBuffer:
+    def __init__(self, capacity=200, spill_path=None):
+        self.capacity = capacity
+        self.entries = deque()
+        self.spill_path = spill_path
+        self.offsets = []  # byte offset of every spilled line, oldest first
+        self.paged = []  # spilled entries read back for display, oldest first
+        if spill_path is not None:
+            open(spill_path, 'w').close()  # the log covers one session
+
+    def __len__(self):
+        return len(self.offsets) + len(self.entries)
+
+    def append(self, text):
+        """Add an entry; returns the entry pushed out of the ring buffer, if any."""
+        self.entries.append(text)
+        if len(self.entries) <= self.capacity: return None
+        evicted = self.entries.popleft()
+        if self.spill_path is not None:
+            with open(self.spill_path, 'ab') as f:
+                self.offsets.append(f.tell())
+                f.write((evicted.replace('\n', ' ') + '\n').encode('utf-8'))
+        if self.paged:
+            self.paged.append(evicted)  # stays contiguous with what is already paged in
+        return evicted
+
+    def rows(self):
+        return self.paged + list(self.entries)
+
+    def older_available(self):
+        """How many spilled entries have not been paged back in."""
+        return len(self.offsets) - len(self.paged)
+
+    def load_older(self, count=50):
+        """Page in up to ``count`` of the newest spilled entries not yet shown; returns them."""
+        end = self.older_available()
+        start = max(0, end - count)
+        if start == end: return []
+        with open(self.spill_path, 'rb') as f:
+            f.seek(self.offsets[start])
+            chunk = f.read(self.offsets[end] - self.offsets[start]) if end < len(self.offsets) else f.read()
+        older = chunk.decode('utf-8').splitlines()
+        self.paged[:0] = older
+        return older
+
+    def drop_paged(self):
+        """Forget paged-in entries so memory returns to the ring buffer's size."""
+        self.paged = []
@@ -1,98 +1,74 @@
+import time
+STARTED = time.perf_counter()  # the startup report is measured from here
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.popup import Popup
-from kivy.storage.jsonstore import JsonStore
 from kivy.clock import Clock
-from kivy.animation import Animation
+from kivy.event import EventDispatcher
+from kivy.logger import Logger
 from kivy.metrics import dp
 from kivy.properties import StringProperty
-from kivy.graphics import Color, Rectangle, Line, Ellipse
+from kivy.graphics import Color, Rectangle, Line, InstructionGroup
 from kivy.utils import platform
 from datetime import datetime
-import random
-from kivy.graphics.vertex_instructions import RoundedRectangle
-
-
-class GameData:
-    def __init__(self):
-        if platform == 'android':
-            from android.storage import app_storage_path
-            json_path = app_storage_path() + '/game_data.json'
-        else:
-            json_path = 'game_data.json'
-        self.store = JsonStore(json_path)
-        self.stats = self.store.get('stats') if self.store.exists('stats') else {'total_time': 0, 'games': 0, 'x_wins': 0, 'o_wins': 0, 'draws': 0}
-        self.ratings = self.store.get('ratings') if self.store.exists('ratings') else {'easy': 1200, 'medium': 1200, 'hard': 1200}
-    def save(self): self.store.put('stats', **self.stats); self.store.put('ratings', **self.ratings)
+import threading
+from storage import JsonDocument
+from logbuffer import LogBuffer
+from rating import INITIAL_RATING, K_FACTOR, basis, replay, update_for_game
+# Widget modules used by a single screen, the engine and the history database
+# are imported when first needed, not at startup.
+
+# (size, win length) choices offered for games against the AI.
+BOARD_OPTIONS = [(3, 3), (4, 4), (5, 4), (15, 5)]
+
+
+def data_path(filename):
+    """Where the app keeps its files: app storage on Android, else the working directory."""
+    if platform == 'android':
+        from android.storage import app_storage_path
+        return app_storage_path() + '/' + filename
+    return filename
+
+class GameData(EventDispatcher):
+    """App-wide stats; dispatches on_change after every update. ``in_memory`` keeps them
+    for this session only, for when the file cannot be used."""
+    __events__ = ('on_change',)
+
+    def __init__(self, in_memory=False, **kwargs):
+        super().__init__(**kwargs)
+        self.store = JsonDocument(None) if in_memory else JsonDocument.open(data_path('game_data.json'))
+        self.stats = self.store.get('stats', {'total_time': 0, 'games': 0, 'x_wins': 0, 'o_wins': 0, 'draws': 0})
+        self.ratings = self.store.get('ratings', {'easy': INITIAL_RATING, 'medium': INITIAL_RATING, 'hard': INITIAL_RATING})
+        self.rating_k = self.store.get('rating_k', K_FACTOR)  # K the stored ratings were computed with
+        self.rating_basis = self.store.get('rating_basis')  # and the AI ratings
+    def save(self):
+        self.store.put('stats', self.stats); self.store.put('ratings', self.ratings)  # written in the background
+        self.store.put('rating_k', self.rating_k); self.store.put('rating_basis', self.rating_basis)
+        self.dispatch('on_change')
+    def on_change(self): pass
+    def flush(self): self.store.flush()
     def update_time(self, elapsed): self.stats['total_time'] += elapsed; self.save()
-    def update_game(self, result):
-        self.stats['games'] += 1
+    def update_game(self, result, difficulty=None, elapsed=0, size=3, win_length=3):
+        """Record one finished game, and its rating change when played against the AI on a
+        calibrated board, in a single save."""
+        self.stats['games'] += 1; self.stats['total_time'] += elapsed
         if result in ['X', 'O']: self.stats[f'{result.lower()}_wins'] += 1
         else: self.stats['draws'] += 1
+        if difficulty is not None: update_for_game(self.ratings, difficulty, result, size, win_length, self.rating_k)
         self.save()
-
-class AIEngine:
-    def __init__(self, difficulty='medium'):
-        self.depths = {'easy': 2, 'medium': 4, 'hard': 6}
-        self.depth = self.depths[difficulty]
-    def get_move(self, board):
-        empty = [i for i, x in enumerate(board) if not x]
-        if not empty: return None
-        best_score, best_move, alpha, beta = float('-inf'), empty[0], float('-inf'), float('inf')
-        for pos in empty:
-            board[pos] = 'O'
-            score = self.minimax(board, self.depth, False, alpha, beta)
-            board[pos] = ''
-            if score > best_score:
-                best_score, best_move = score, pos
-            alpha = max(alpha, best_score)
-            if beta <= alpha: break
-        return best_move
-    def minimax(self, board, depth, is_max, alpha, beta):
-        winner = self.check_winner(board)
-        if winner: return 100 if winner == 'O' else -100
-        if depth == 0 or '' not in board: return self.evaluate_board(board)
-        empty = [i for i, x in enumerate(board) if not x]
-        if not empty: return 0
-        if is_max:
-            max_score = float('-inf')
-            for pos in empty:
-                board[pos] = 'O'
-                score = self.minimax(board, depth - 1, False, alpha, beta)
-                board[pos] = ''
-                max_score = max(max_score, score)
-                alpha = max(alpha, max_score)
-                if beta <= alpha: break
-            return max_score
-        else:
-            min_score = float('inf')
-            for pos in empty:
-                board[pos] = 'X'
-                score = self.minimax(board, depth - 1, True, alpha, beta)
-                board[pos] = ''
-                min_score = min(min_score, score)
-                beta = min(beta, min_score)
-                if beta <= alpha: break
-            return min_score
-    def evaluate_board(self, board):
-        wins = [(0,1,2), (3,4,5), (6,7,8), (0,3,6), (1,4,7), (2,5,8), (0,4,8), (2,4,6)]
-        score = 0
-        for w in wins:
-            line = [board[i] for i in w]
-            if line.count('O') == 2 and line.count('') == 1: score += 5
-            elif line.count('X') == 2 and line.count('') == 1: score -= 5
-            elif line.count('O') == 3: score += 100
-            elif line.count('X') == 3: score -= 100
-        return score
-    def check_winner(self, board):
-        wins = [(0,1,2), (3,4,5), (6,7,8), (0,3,6), (1,4,7), (2,5,8), (0,4,8), (2,4,6)]
-        for i, j, k in wins:
-            if board[i] and board[i] == board[j] == board[k]: return board[i]
-        return None
+    def recompute_ratings(self, history, k=K_FACTOR):
+        """Rebuild the ratings from the game history on a worker thread, e.g. after a K-factor change."""
+        def work():
+            from profiler import span
+            with span("GameHistory.games (rating replay)", 'storage'):  # the reads happen while iterating
+                ratings = replay(history.games(mode='ai', newest_first=False), k)
+            Clock.schedule_once(lambda dt: apply(ratings))
+        def apply(ratings):
+            self.ratings.update(ratings); self.rating_k = k; self.rating_basis = basis()
+            self.save()
+        threading.Thread(target=work, daemon=True).start()
 
 class StyledButton(Button):
     def __init__(self, **kwargs):
@@ -102,19 +78,37 @@ class StyledButton(Button):
         self.color = (0.1, 0.1, 0.1, 1)
         self.font_size = dp(18)
 
-    def on_size(self, *args):
-        self.canvas.before.clear()
+        # Instructions are created once; resizing only moves them
         with self.canvas.before:
             Color(0.93, 0.93, 0.93, 1)  # Light gray background
-            Rectangle(pos=self.pos, size=self.size)
+            self.bg = Rectangle(pos=self.pos, size=self.size)
             Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(self.x, self.y, self.width, self.height), width=1.5)
+            self.outline = Line(rectangle=(self.x, self.y, self.width, self.height), width=1.5)
 
             # Professional gradient effect
             Color(0.2, 0.4, 0.6, 0.2)  # Subtle blue tint
-            Rectangle(pos=(self.x, self.y), size=(self.width, self.height/2))
+            self.tint = Rectangle(pos=self.pos, size=(self.width, self.height/2))
+        self.bind(pos=self._update_graphics, size=self._update_graphics)
 
+    def _update_graphics(self, *args):
+        self.bg.pos, self.bg.size = self.pos, self.size
+        self.outline.rectangle = (self.x, self.y, self.width, self.height)
+        self.tint.pos, self.tint.size = self.pos, (self.width, self.height/2)
 
+class PanelButton(Button):
+    """Button with a flat fill and a black border, drawn once and moved on resize."""
+    def __init__(self, fill=(0.1, 0.3, 0.5, 1), **kwargs):  # Professional blue
+        super().__init__(**kwargs)
+        with self.canvas.before:
+            self.fill = Color(*fill)
+            self.bg = Rectangle(pos=self.pos, size=self.size)
+            Color(0, 0, 0, 1)  # Black border
+            self.outline = Line(rectangle=(self.x, self.y, self.width, self.height), width=1)
+        self.bind(pos=self._update_graphics, size=self._update_graphics)
+
+    def _update_graphics(self, *args):
+        self.bg.pos, self.bg.size = self.pos, self.size
+        self.outline.rectangle = (self.x, self.y, self.width, self.height)
 
 class GameButton(Button):
     def __init__(self, **kwargs):
@@ -122,39 +116,60 @@ class GameButton(Button):
         self.background_color = (0, 0, 0, 0)
         self.background_normal = ''
         self.mark = ''
-        self.bind(size=self.enforce_square)  # Ensure square size
-
-    def enforce_square(self, *args):
-        """Ensure the button remains a perfect square."""
-        min_side = min(self.size)  # Take the smallest dimension
-        self.size = (min_side, min_side)  # Force square shape
-
-    def on_size(self, *args):
-        self.canvas.before.clear()
         with self.canvas.before:
             Color(0.95, 0.95, 0.95, 1)  # Light gray background
-            Rectangle(pos=self.pos, size=self.size)
+            self.bg = Rectangle()
             Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(self.x, self.y, self.width, self.height), width=2)
+            self.outline = Line(width=2)
+        # One cached group per mark; set_mark swaps which one is on the canvas
+        self.marks = {'X': InstructionGroup(), 'O': InstructionGroup()}
+        self.x_lines = [Line(), Line()]
+        self.o_line = Line()
+        self.marks['X'].add(Color(0.8, 0.2, 0.2, 1))  # Professional red
+        for line in self.x_lines: self.marks['X'].add(line)
+        self.marks['O'].add(Color(0.2, 0.4, 0.8, 1))  # Professional blue
+        self.marks['O'].add(self.o_line)
+        self.bind(pos=self._update_graphics, size=self._update_graphics)
+
+    def square(self):
+        """(x, y, side) of the largest square centred in the button; cells are drawn square
+        without resizing the widget from inside its own size handler.
+        """
+        side = min(self.size)
+        return self.center_x - side / 2, self.center_y - side / 2, side
+
+    def _update_graphics(self, *args):
+        x, y, side = self.square()
+        self.bg.pos, self.bg.size = (x, y), (side, side)
+        self.outline.rectangle = (x, y, side, side)
+        # Shrink the inset and stroke on the small cells of larger boards
+        inset = min(dp(10), side * 0.15)
+        width = max(1, min(dp(3), side * 0.06))
+        lo, hi = inset, side - inset
+        self.x_lines[0].points = [x + lo, y + lo, x + hi, y + hi]
+        self.x_lines[1].points = [x + hi, y + lo, x + lo, y + hi]
+        self.o_line.ellipse = (x + lo, y + lo, hi - lo, hi - lo)
+        for line in self.x_lines + [self.o_line]: line.width = width
+        self.font_size = side * 0.3
 
     def set_mark(self, mark):
+        if mark == self.mark: return
+        if self.mark: self.canvas.after.remove(self.marks[self.mark])
+        if mark: self.canvas.after.add(self.marks[mark])
         self.mark = mark
-        self.canvas.after.clear()
-        if mark == 'X':
-            with self.canvas.after:
-                Color(0.8, 0.2, 0.2, 1)  # Professional red
-                Line(points=[self.x + dp(10), self.y + dp(10),
-                            self.x + self.width - dp(10), self.y + self.height - dp(10)],
-                    width=dp(3))
-                Line(points=[self.x + self.width - dp(10), self.y + dp(10),
-                            self.x + dp(10), self.y + self.height - dp(10)],
-                    width=dp(3))
-        elif mark == 'O':
-            with self.canvas.after:
-                Color(0.2, 0.4, 0.8, 1)  # Professional blue
-                Line(ellipse=(self.x + dp(10), self.y + dp(10),
-                            self.width - dp(20), self.height - dp(20)),
-                    width=dp(3))
+
+    def show_analysis(self, entry, best=False):
+        """Overlay an analysis entry: W/L and plies to the result, D for a draw, else the score."""
+        result, distance, score = entry
+        if result == 'win': self.text, self.color = f"W{distance}", (0.1, 0.6, 0.3, 1)
+        elif result == 'loss': self.text, self.color = f"L{distance}", (0.7, 0.1, 0.1, 1)
+        elif result == 'draw': self.text, self.color = "D", (0.4, 0.4, 0.4, 1)
+        else: self.text, self.color = f"{score:+d}", (0.4, 0.4, 0.4, 1)
+        if best: self.text = f"[b]{self.text}[/b]"
+        self.markup = best
+
+    def clear_analysis(self):
+        self.text = ''
 
 
 
@@ -214,15 +229,9 @@ class DifficultyScreen(Screen):
         layout = BoxLayout(orientation='vertical', padding=dp(20), spacing=dp(15))
 
         header = BoxLayout(size_hint_y=0.15)
-        back_btn = Button(text="back", size_hint=(0.15, 1), background_normal='',
+        back_btn = PanelButton(text="back", size_hint=(0.15, 1), background_normal='',
                          font_size=dp(30), color=(0,0,0))
-        with back_btn.canvas.before:
-            Color(0.1, 0.3, 0.5, 1)  # Professional blue
-            Rectangle(pos=back_btn.pos, size=back_btn.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(back_btn.pos[0], back_btn.pos[1], back_btn.width, back_btn.height), width=1)
         back_btn.bind(on_release=lambda x: setattr(self.manager, 'current', 'home'))
-        back_btn.bind(pos=self._update_back_btn, size=self._update_back_btn)
         header.add_widget(back_btn)
         header.add_widget(Label(text="Select Difficulty", font_size=dp(28), color=(0.1, 0.3, 0.5, 1)))
         header.add_widget(BoxLayout(size_hint_x=0.15))
@@ -232,17 +241,19 @@ class DifficultyScreen(Screen):
 
         buttons_layout = BoxLayout(orientation='vertical', spacing=dp(20), size_hint_y=0.6)
 
+        self.board_option = 0
+        self.board_btn = StyledButton(text=self._board_text(), size_hint=(0.7, 0.33))
+        self.board_btn.bind(on_release=self.cycle_board)
+        btn_layout = BoxLayout()
+        btn_layout.add_widget(BoxLayout(size_hint_x=0.15))
+        btn_layout.add_widget(self.board_btn)
+        btn_layout.add_widget(BoxLayout(size_hint_x=0.15))
+        buttons_layout.add_widget(btn_layout)
+
         for diff, color in [('easy', (0.1, 0.6, 0.3, 1)), ('medium', (0.7, 0.5, 0.1, 1)), ('hard', (0.7, 0.1, 0.1, 1))]:
-            btn = Button(text=diff.title(), size_hint=(0.7, 0.33),
+            btn = PanelButton(fill=color, text=diff.title(), size_hint=(0.7, 0.33),
                          background_normal='', font_size=dp(24), color=(0,0,0))
-            with btn.canvas.before:
-                Color(*color)
-                Rectangle(pos=btn.pos, size=btn.size)
-                Color(0, 0, 0, 1)  # Black border
-                Line(rectangle=(btn.pos[0], btn.pos[1], btn.width, btn.height), width=1)
             btn.bind(on_release=lambda x, d=diff: self.start_game(d))
-            btn.bind(pos=lambda instance, value, b=btn, c=color: self._update_btn(b, c),
-                   size=lambda instance, value, b=btn, c=color: self._update_btn(b, c))
 
             btn_layout = BoxLayout()
             btn_layout.add_widget(BoxLayout(size_hint_x=0.15))
@@ -264,34 +275,44 @@ class DifficultyScreen(Screen):
         self.rect.pos = instance.pos
         self.rect.size = instance.size
 
-    def _update_back_btn(self, instance, value):
-        instance.canvas.before.clear()
-        with instance.canvas.before:
-            Color(0.1, 0.3, 0.5, 1)  # Professional blue
-            Rectangle(pos=instance.pos, size=instance.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(instance.x, instance.y, instance.width, instance.height), width=1)
+    def _board_text(self):
+        size, win_length = BOARD_OPTIONS[self.board_option]
+        return f"Board: {size}x{size}, {win_length} in a row"
 
-    def _update_btn(self, btn, color):
-        btn.canvas.before.clear()
-        with btn.canvas.before:
-            Color(*color)
-            Rectangle(pos=btn.pos, size=btn.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(btn.x, btn.y, btn.width, btn.height), width=1)
+    def cycle_board(self, *args):
+        self.board_option = (self.board_option + 1) % len(BOARD_OPTIONS)
+        self.board_btn.text = self._board_text()
 
     def start_game(self, difficulty):
         game_screen = self.manager.get_screen('game')
-        game_screen.setup_game(difficulty, True)
+        game_screen.setup_game(difficulty, True, *BOARD_OPTIONS[self.board_option])
         self.manager.current = 'game'
 
 class GameScreen(Screen):
     current_player = StringProperty('X')
+    # Levels whose AI searches ahead during the player's turn and replies at once
+    PONDER_DIFFICULTIES = ('medium', 'hard')
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.game_data = GameData()
+        self.game_data = App.get_running_app().game_data
+        from session import GameSession
+        self.session = GameSession(3, 3)
+        self.geometry = self.session.geometry
+        self.client = None  # connection to the local game server, for two-player games
+        self.remote_game = None
+        self.pending_moves = []  # taps made before the server said which game this is
         self.start_time = None
+        self.ai_trigger = None
+        self.ai_cancel = None
+        self.ponder_cancel = None
+        self.ai_started = None
+        self.thinking_event = None
+        self.board_pool = {}
+        self.result_popup = None  # built at the end of the first game
+        self.analyst = None
+        self.hint_cancel = None
+        self.hints_shown = False
         self.setup_ui()
     def _adjust_board_size(self, instance, value):
         """Force the board to remain a square and center it."""
@@ -302,7 +323,7 @@ class GameScreen(Screen):
         layout = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
 
         header = BoxLayout(size_hint_y=0.15)
-        back_btn = Button(
+        back_btn = PanelButton(
             text="Back",
             size_hint=(None, None),  # Allow manual size control
             font_size=dp(30),
@@ -311,29 +332,23 @@ class GameScreen(Screen):
             padding=(dp(10), dp(10)),  # Padding for spacing
             pos_hint={'x': 0, 'top': 1}  # Fixed to top-left corner
         )
-        with back_btn.canvas.before:
-            Color(0.1, 0.3, 0.5, 1)  # Professional blue
-            Rectangle(pos=back_btn.pos, size=back_btn.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(back_btn.pos[0], back_btn.pos[1], back_btn.width, back_btn.height), width=1)
         back_btn.bind(on_release=self.go_back)
-        back_btn.bind(pos=self._update_back_btn, size=self._update_back_btn)
         header.add_widget(back_btn)
 
         self.status_label = Label(text='', font_size=dp(22), color=(0.1, 0.3, 0.5, 1))
         header.add_widget(self.status_label)
-        header.add_widget(BoxLayout(size_hint_x=0.15))
+        self.hint_btn = PanelButton(text="Hint", size_hint_x=0.15, font_size=dp(20), color=(0, 0, 0),
+                                    background_normal='')
+        self.hint_btn.bind(on_release=self.toggle_hints)
+        header.add_widget(self.hint_btn)
 
         layout.add_widget(header)
 
         # Centering the board and forcing square shape
         board_container = BoxLayout(size_hint=(None, None), size=(dp(300), dp(300)), pos_hint={'center_x': 0.5, 'center_y': 0.5})
+        from kivy.uix.gridlayout import GridLayout
         self.board = GridLayout(cols=3, rows=3, spacing=0, size_hint=(1, 1))  # No spacing for joined blocks
-
-        self.buttons = [GameButton() for _ in range(9)]
-        for i, btn in enumerate(self.buttons):
-            btn.bind(on_release=lambda x, idx=i: self.make_move(idx))
-            self.board.add_widget(btn)
+        self._build_board()
 
         board_container.add_widget(self.board)
         layout.add_widget(board_container)
@@ -349,22 +364,36 @@ class GameScreen(Screen):
 
         self.add_widget(layout)
 
+    def _build_board(self):
+        size = self.geometry.size
+        self.board.clear_widgets()
+        self.board.cols = self.board.rows = size
+        if size not in self.board_pool:  # cells are kept per board size and reused
+            buttons = [GameButton() for _ in range(size * size)]
+            for i, btn in enumerate(buttons):
+                btn.bind(on_release=lambda x, idx=i: self.make_move(idx))
+            self.board_pool[size] = buttons
+        self.buttons = self.board_pool[size]
+        for btn in self.buttons:
+            self.board.add_widget(btn)
+
     def _update_rect(self, instance, value):
         self.rect.pos = instance.pos
         self.rect.size = instance.size
 
-    def _update_back_btn(self, instance, value):
-        instance.canvas.before.clear()
-        with instance.canvas.before:
-            Color(0.1, 0.3, 0.5, 1)  # Professional blue
-            Rectangle(pos=instance.pos, size=instance.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(instance.x, instance.y, instance.width, instance.height), width=1)
-
-    def setup_game(self, difficulty, is_ai):
+    def setup_game(self, difficulty, is_ai, size=3, win_length=3):
         self.difficulty = difficulty
         self.is_ai = is_ai
-        self.ai = AIEngine(difficulty) if is_ai else None
+        from engine import AIEngine
+        from session import GameSession
+        if (size, win_length) != (self.geometry.size, self.geometry.win_length):
+            self.session = GameSession(size, win_length)
+            self.geometry = self.session.geometry
+            self._build_board()
+        self.ai = AIEngine(difficulty, size, win_length) if is_ai else None
+        if is_ai: self.disconnect()
+        elif self.client is None: self.connect()
+        self.analyst = AIEngine('hard', size, win_length)
         self.reset_game()
         self.start_time = datetime.now()
 
@@ -375,36 +404,191 @@ class GameScreen(Screen):
 
     def make_move(self, idx):
         if self.game_over or self.buttons[idx].mark: return
-        self.buttons[idx].set_mark(self.current_player)
-        if self.check_game_state():
+        if self.is_ai and self.current_player == 'O': return  # AI's turn
+        if self.client is not None:  # the server applies the move and sends back the new state
+            if self.remote_game is not None: self.client.send({'op': 'move', 'game': self.remote_game, 'cell': idx})
+            elif idx not in self.pending_moves: self.pending_moves.append(idx)
+            return
+        self.stop_ponder()
+        self._place(idx, self.current_player)
+        if self.check_game_state(idx):
             if self.is_ai and self.current_player == 'O' and not self.game_over:
-                Clock.schedule_once(lambda dt: self.make_ai_move(), 0.5)
+                delay = 0 if self.difficulty in self.PONDER_DIFFICULTIES else 0.5
+                self.ai_trigger = Clock.schedule_once(lambda dt: self.make_ai_move(), delay)
 
     def make_ai_move(self):
+        """Start the AI search on a worker thread; the move lands via the Clock."""
+        self.ai_trigger = None
+        self.cancel_ai()
         board = [btn.mark for btn in self.buttons]
-        move = self.ai.get_move(board)
+        cancel = threading.Event()
+        self.ai_cancel = cancel
+        self.ai_started = time.monotonic()
+        self.thinking_event = Clock.schedule_interval(self._update_thinking, 0.1)
+        threading.Thread(target=self._search_ai_move, args=(self.ai, board, cancel), daemon=True).start()
+
+    def _search_ai_move(self, ai, board, cancel):
+        from engine import SearchCancelled
+        try:
+            result = ai.search(board, cancel)
+        except SearchCancelled:
+            return
+        move = result.pop('move')  # the rest describes the search, for the game record
+        Clock.schedule_once(lambda dt: self._apply_ai_move(move, cancel, result))
+
+    def _apply_ai_move(self, move, cancel, search=None):
+        if cancel is not self.ai_cancel or cancel.is_set(): return  # stale result
+        self._stop_thinking()
+        self.ai_cancel = None
         if move is not None:
-            self.buttons[move].set_mark('O')
-            self.check_game_state()
-
-    def check_game_state(self):
+            self._place(move, 'O', search)
+            if self.check_game_state(move): self.start_ponder()
+
+    def _update_thinking(self, dt):
+        self.status_label.text = f"AI thinking... {time.monotonic() - self.ai_started:.1f}s"
+
+    def _stop_thinking(self):
+        if self.thinking_event is not None:
+            self.thinking_event.cancel()
+            self.thinking_event = None
+
+    def cancel_ai(self):
+        """Drop any pending or in-flight AI search so it cannot touch the board."""
+        if self.ai_trigger is not None:
+            self.ai_trigger.cancel()
+            self.ai_trigger = None
+        if self.ai_cancel is not None:
+            self.ai_cancel.set()
+            self.ai_cancel = None
+        self._stop_thinking()
+        self.stop_ponder()
+
+    def start_ponder(self):
+        """Search the AI's replies to the player's likely moves while they think."""
+        if not self.is_ai or self.difficulty not in self.PONDER_DIFFICULTIES: return
+        if self.game_over or self.current_player != 'X': return
+        self.stop_ponder()
+        cancel = threading.Event()
+        self.ponder_cancel = cancel
         board = [btn.mark for btn in self.buttons]
-        winner = self.check_winner(board)
-        if winner:
-            self.handle_game_end(winner)
-            return False
-        elif '' not in board:
-            self.handle_game_end('draw')
+        threading.Thread(target=self.ai.ponder, args=(board, cancel), daemon=True).start()
+
+    def stop_ponder(self):
+        if self.ponder_cancel is not None:
+            self.ponder_cancel.set()
+            self.ponder_cancel = None
+
+    def toggle_hints(self, *args):
+        """Show or hide every empty cell's value for the player to move."""
+        if self.hints_shown or self.hint_cancel is not None:
+            self.hide_hints()
+            return
+        if self.game_over or (self.is_ai and self.current_player == 'O'): return
+        self.stop_ponder()  # the analysis needs the search lock
+        board = [btn.mark for btn in self.buttons]
+        cancel = threading.Event()
+        self.hint_cancel = cancel
+        self.hint_btn.text = "..."
+        threading.Thread(target=self._analyse, args=(board, self.current_player, cancel), daemon=True).start()
+
+    def _analyse(self, board, player, cancel):
+        from engine import SearchCancelled
+        try:
+            analysis = self.analyst.analyse(board, player, cancel)  # cached, so re-showing is instant
+        except SearchCancelled:
+            return
+        Clock.schedule_once(lambda dt: self._show_hints(analysis, cancel))
+
+    def _show_hints(self, analysis, cancel):
+        if cancel is not self.hint_cancel or cancel.is_set(): return  # the board moved on
+        from engine import hint_rank
+        self.hint_cancel = None
+        self.hints_shown = True
+        self.hint_btn.text = "Hide"
+        best = max(analysis, key=lambda cell: hint_rank(analysis[cell]), default=None)
+        for cell, entry in analysis.items():
+            self.buttons[cell].show_analysis(entry, cell == best)
+        self.start_ponder()
+
+    def hide_hints(self):
+        if self.hint_cancel is not None:
+            self.hint_cancel.set()
+            self.hint_cancel = None
+        if self.hints_shown:
+            for btn in self.buttons: btn.clear_analysis()
+            self.hints_shown = False
+        self.hint_btn.text = "Hint"
+
+    def connect(self):
+        """Play two-player games through the app's local game server; hot seat if it is not running."""
+        port = App.get_running_app().server_port
+        if port is None: return
+        from netclient import GameClient
+        try:
+            self.client = GameClient('127.0.0.1', port, lambda message: Clock.schedule_once(
+                lambda dt: self.on_server_message(message)), self._disconnected)
+        except OSError as e:
+            Logger.warning(f"Game server: {e}; playing on this device")
+
+    def _disconnected(self):
+        Clock.schedule_once(lambda dt: self.disconnect())
+
+    def disconnect(self):
+        if self.client is not None:
+            self.client.on_close = None
+            self.client.close()
+        self.client = self.remote_game = None
+        self.pending_moves = []
+
+    def new_remote_game(self):
+        if self.remote_game is not None: self.client.send({'op': 'leave', 'game': self.remote_game})
+        self.remote_game = None
+        self.pending_moves = []
+        self.client.send({'op': 'new', 'mode': 'pvp', 'seat': 'both', 'size': self.geometry.size,
+                          'win': self.geometry.win_length})
+
+    def on_server_message(self, message):
+        op = message.get('op')
+        if op == 'joined':
+            self.remote_game = message['game']
+            for idx in self.pending_moves: self.client.send({'op': 'move', 'game': self.remote_game, 'cell': idx})
+            self.pending_moves = []
+        elif op == 'error': Logger.warning(f"Game server: {message['message']}")
+        elif op == 'state' and message['game'] == self.remote_game:
+            for idx in message['moves'][len(self.session.moves):]:  # moves this screen has not drawn yet
+                self._place(idx, self.session.turn)
+                if not self.check_game_state(idx): break
+
+    def _place(self, idx, mark, search=None):
+        self.hide_hints()
+        self.session.play(idx, mark, **(search or {}))
+        self.buttons[idx].set_mark(mark)
+
+    def check_game_state(self, last):
+        """Read the outcome of the ``last`` move from the session."""
+        if self.session.over:
+            self.handle_game_end(self.session.result)
             return False
-        self.current_player = 'O' if self.current_player == 'X' else 'X'
+        self.current_player = self.session.turn
         self.status_label.text = f"{'Your' if self.current_player == 'X' else 'AI' if self.is_ai else 'Player O'}'s Turn"
         return True
 
     def handle_game_end(self, result):
         self.game_over = True
         elapsed = (datetime.now() - self.start_time).total_seconds()
-        self.game_data.update_time(elapsed)
-        self.game_data.update_game(result)
+        self.game_data.update_game(result, self.difficulty if self.is_ai else None, elapsed,
+                                   self.geometry.size, self.geometry.win_length)
+        history = App.get_running_app().history
+        if history is not None:
+            history.append('ai' if self.is_ai else 'pvp', self.difficulty if self.is_ai else None,
+                           self.geometry.size, self.geometry.win_length, self.session.moves, result, elapsed)
+        from gamerecord import make_record, write_records
+        record = make_record(self.geometry.size, self.geometry.win_length, self.session.moves, result, 'human',
+                             self.difficulty if self.is_ai else 'human', self.session.depths,
+                             nodes=self.session.nodes, pondered=self.session.pondered, duration=elapsed)
+        # One line appended off the UI thread; the file can be replayed with gamerecord.py
+        threading.Thread(target=write_records, args=(data_path('game_records.jsonl'), [record], True),
+                         daemon=True).start()
 
         if result == 'draw':
             msg = "It's a Draw!"
@@ -420,16 +604,18 @@ class GameScreen(Screen):
         log_screen = self.manager.get_screen('logs')
         log_screen.add_log(log_msg)
 
+        if self.result_popup is None: self._build_result_popup()
+        self.result_label.text = msg
+        self.result_popup.open()
+
+    def _build_result_popup(self):
+        """The game-over dialog, built once and reopened with a new message each game."""
+        from kivy.uix.popup import Popup
         content = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(20))
-        content.add_widget(Label(text=msg, font_size=dp(24)))
-        btn = Button(text="PLAY AGAIN", size_hint=(0.5, None), height=dp(50),
+        self.result_label = Label(text='', font_size=dp(24))
+        content.add_widget(self.result_label)
+        btn = PanelButton(text="PLAY AGAIN", size_hint=(0.5, None), height=dp(50),
                     background_normal='', color=(0,0,0))
-        with btn.canvas.before:
-            Color(0.1, 0.3, 0.5, 1)  # Professional blue
-            Rectangle(pos=btn.pos, size=btn.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(btn.pos[0], btn.pos[1], btn.width, btn.height), width=1)
-        btn.bind(pos=self._update_popup_btn, size=self._update_popup_btn)
 
         btn_layout = BoxLayout()
         btn_layout.add_widget(BoxLayout())
@@ -437,21 +623,12 @@ class GameScreen(Screen):
         btn_layout.add_widget(BoxLayout())
         content.add_widget(btn_layout)
 
-        popup = Popup(title="Game Over", content=content, size_hint=(0.8, 0.4),
+        self.result_popup = Popup(title="Game Over", content=content, size_hint=(0.8, 0.4),
                      title_color=(0.1, 0.3, 0.5, 1), title_size=dp(20))
-        btn.bind(on_release=lambda x: self.handle_replay(popup))
-        popup.open()
-
-    def _update_popup_btn(self, instance, value):
-        instance.canvas.before.clear()
-        with instance.canvas.before:
-            Color(0.1, 0.3, 0.5, 1)  # Professional blue
-            Rectangle(pos=instance.pos, size=instance.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(instance.x, instance.y, instance.width, instance.height), width=1)
+        btn.bind(on_release=self.handle_replay)
 
-    def handle_replay(self, popup):
-        popup.dismiss()
+    def handle_replay(self, *args):
+        self.result_popup.dismiss()
         self.reset_game()
 
         # Update game logs
@@ -460,41 +637,39 @@ class GameScreen(Screen):
         log_screen.add_log(f"Started new game: {mode}")
 
     def reset_game(self):
+        self.cancel_ai()
+        self.hide_hints()
+        if self.ai is not None: self.ai.new_game()  # records replay from a cold table
         self.game_over = False
-        self.current_player = 'X'
+        self.session.reset()
+        self.current_player = self.session.turn
+        if self.client is not None: self.new_remote_game()
         for btn in self.buttons:
-            btn.mark = ''
-            btn.canvas.after.clear()
+            btn.set_mark('')
         self.status_label.text = "Your Turn"
         self.start_time = datetime.now()
-
-    def check_winner(self, board):
-        wins = [(0,1,2), (3,4,5), (6,7,8), (0,3,6), (1,4,7), (2,5,8), (0,4,8), (2,4,6)]
-        for i, j, k in wins:
-            if board[i] and board[i] == board[j] == board[k]:
-                return board[i]
-        return None
+        self.start_ponder()
 
     def go_back(self, *args):
+        self.cancel_ai()
+        self.hide_hints()
+        self.disconnect()
         if self.start_time:
             self.game_data.update_time((datetime.now() - self.start_time).total_seconds())
         self.manager.current = 'home'
 
 class StatsScreen(Screen):
+    STAT_NAMES = ("Total Time", "Games Played", "X Wins", "O Wins", "Draws",
+                  "Easy Rating", "Medium Rating", "Hard Rating")
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         layout = BoxLayout(orientation='vertical', padding=dp(20))
 
         header = BoxLayout(size_hint_y=0.15)
-        back_btn = Button(text="←", size_hint=(0.15, 1), background_normal='',
+        back_btn = PanelButton(text="←", size_hint=(0.15, 1), background_normal='',
                          font_size=dp(30), color=(1, 1, 1, 1))
-        with back_btn.canvas.before:
-            Color(0.1, 0.3, 0.5, 1)  # Professional blue
-            Rectangle(pos=back_btn.pos, size=back_btn.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(back_btn.pos[0], back_btn.pos[1], back_btn.width, back_btn.height), width=1)
         back_btn.bind(on_release=lambda x: setattr(self.manager, 'current', 'home'))
-        back_btn.bind(pos=self._update_back_btn, size=self._update_back_btn)
         header.add_widget(back_btn)
         header.add_widget(Label(text="Statistics", font_size=dp(28), color=(0.1, 0.3, 0.5, 1)))
         header.add_widget(BoxLayout(size_hint_x=0.15))
@@ -502,10 +677,21 @@ class StatsScreen(Screen):
         layout.add_widget(header)
 
         stats_container = BoxLayout(padding=dp(10))
+        from kivy.uix.gridlayout import GridLayout
         self.stats_layout = GridLayout(cols=2, spacing=dp(10), padding=dp(20))
+        self.value_labels = []
+        for key in self.STAT_NAMES:
+            value = Label(text='', font_size=dp(18), color=(0.1, 0.3, 0.5, 1), halign='left')
+            self.stats_layout.add_widget(Label(text=key, font_size=dp(18), color=(0.1, 0.1, 0.1, 1), halign='right'))
+            self.stats_layout.add_widget(value)
+            self.value_labels.append(value)
         stats_container.add_widget(self.stats_layout)
         layout.add_widget(stats_container)
 
+        self.game_data = App.get_running_app().game_data
+        self.stale = True
+        self.game_data.bind(on_change=self._mark_stale)
+
         with self.canvas.before:
             Color(0.97, 0.97, 0.97, 1)  # Professional white background
             self.rect = Rectangle(pos=self.pos, size=self.size)
@@ -517,42 +703,41 @@ class StatsScreen(Screen):
         self.rect.pos = instance.pos
         self.rect.size = instance.size
 
-    def _update_back_btn(self, instance, value):
-        instance.canvas.before.clear()
-        with instance.canvas.before:
-            Color(0.1, 0.3, 0.5, 1)  # Professional blue
-            Rectangle(pos=instance.pos, size=instance.size)
-            Color(0, 0, 0, 1)  # Black border
-            Line(rectangle=(instance.x, instance.y, instance.width, instance.height), width=1)
+    def _mark_stale(self, *args):
+        self.stale = True
 
-    def on_enter(self):
-        self.stats_layout.clear_widgets()
-        game_data = GameData()
-        stats = game_data.stats
+    def stat_values(self):
+        stats, ratings = self.game_data.stats, self.game_data.ratings
         hours = stats['total_time'] // 3600
         minutes = (stats['total_time'] % 3600) // 60
+        return [f"{int(hours)}h {int(minutes)}m", str(stats['games']), str(stats['x_wins']),
+                str(stats['o_wins']), str(stats['draws']), str(int(ratings['easy'])),
+                str(int(ratings['medium'])), str(int(ratings['hard']))]
 
-        stat_items = [
-            ("Total Time", f"{int(hours)}h {int(minutes)}m"),
-            ("Games Played", str(stats['games'])),
-            ("X Wins", str(stats['x_wins'])),
-            ("O Wins", str(stats['o_wins'])),
-            ("Draws", str(stats['draws'])),
-            ("Easy Rating", str(int(game_data.ratings['easy']))),
-            ("Medium Rating", str(int(game_data.ratings['medium']))),
-            ("Hard Rating", str(int(game_data.ratings['hard'])))
-        ]
+    def on_enter(self):
+        """Refresh from the in-memory stats; only labels whose text changed are touched."""
+        if not self.stale: return
+        self.stale = False
+        for label, value in zip(self.value_labels, self.stat_values()):
+            if label.text != value: label.text = value
 
-        for key, value in stat_items:
-            label1 = Label(text=key, font_size=dp(18), color=(0.1, 0.1, 0.1, 1), halign='right')
-            label2 = Label(text=value, font_size=dp(18), color=(0.1, 0.3, 0.5, 1), halign='left')
-            self.stats_layout.add_widget(label1)
-            self.stats_layout.add_widget(label2)
 
 
 
+class LogRow(Label):
+    """One RecycleView row of the game log."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.font_size = dp(16)
+        self.color = (0.2, 0.2, 0.2, 1)
+        self.halign = 'left'
+        self.valign = 'middle'
+        self.bind(size=self.setter('text_size'))
 
 class LogScreen(Screen):
+    CAPACITY = 200  # rows kept in memory; older ones spill to disk
+    PAGE = 50
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         layout = BoxLayout(orientation='vertical', padding=dp(20))
@@ -567,11 +752,21 @@ class LogScreen(Screen):
 
         layout.add_widget(header)
 
-        self.log_label = Label(text="Game Logs\n", font_size=dp(16), color=(0.2, 0.2, 0.2, 1), halign='left', valign='top')
-        self.log_label.bind(size=self.log_label.setter('text_size'))
-        scroll_layout = BoxLayout(padding=dp(10))
-        scroll_layout.add_widget(self.log_label)
-        layout.add_widget(scroll_layout)
+        self.log = LogBuffer(self.CAPACITY, data_path('game_log.txt'))
+        self.older_btn = Button(text="Load older entries", size_hint_y=None, height=0, opacity=0,
+                                disabled=True, font_size=dp(16), color=(0, 0, 0, 1), background_normal='')
+        self.older_btn.bind(on_release=self.load_older)
+        layout.add_widget(self.older_btn)
+
+        # Only the rows in view get widgets; the rest is plain data
+        from kivy.uix.recycleview import RecycleView
+        from kivy.uix.recycleboxlayout import RecycleBoxLayout
+        self.log_view = RecycleView(viewclass=LogRow, do_scroll_x=False)
+        rows = RecycleBoxLayout(orientation='vertical', size_hint_y=None,
+                                default_size=(None, dp(28)), default_size_hint=(1, None), padding=dp(10))
+        rows.bind(minimum_height=rows.setter('height'))
+        self.log_view.add_widget(rows)
+        layout.add_widget(self.log_view)
 
         with self.canvas.before:
             Color(0.95, 0.95, 0.98, 1)
@@ -586,27 +781,180 @@ class LogScreen(Screen):
 
     def add_log(self, message):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.log_label.text += f"[{timestamp}] {message}\n"
+        entry = f"[{timestamp}] {message}"
+        evicted = self.log.append(entry)
+        data = self.log_view.data
+        data.append({'text': entry})
+        if evicted is not None and not self.log.paged: data.pop(0)
+        self._update_older_btn()
+
+    def _update_older_btn(self):
+        available = self.log.older_available() > 0
+        self.older_btn.disabled = not available
+        self.older_btn.opacity = 1 if available else 0
+        self.older_btn.height = dp(36) if available else 0
+
+    def load_older(self, *args):
+        older = self.log.load_older(self.PAGE)
+        self.log_view.data[:0] = [{'text': entry} for entry in older]
+        self._update_older_btn()
+
+    def on_leave(self):
+        # Paged-in history is only kept while the screen is open
+        if self.log.paged:
+            self.log.drop_paged()
+            self.log_view.data = [{'text': entry} for entry in self.log.rows()]
+            self._update_older_btn()
+
+class LazyScreenManager(ScreenManager):
+    """ScreenManager that builds each registered screen the first time it is asked for."""
+    def __init__(self, factories, **kwargs):
+        super().__init__(**kwargs)
+        self.factories = dict(factories)
+        self.build_times = {}  # name -> seconds spent constructing the screen
+
+    def get_screen(self, name):
+        factory = self.factories.pop(name, None)
+        if factory is not None:
+            start = time.perf_counter()
+            self.add_widget(factory(name=name))
+            self.build_times[name] = time.perf_counter() - start
+            Logger.info(f"Startup: built {name} screen in {self.build_times[name] * 1000:.1f} ms")
+        return super().get_screen(name)
+
+    def has_screen(self, name):
+        return name in self.factories or super().has_screen(name)
 
 class TicTacToeApp(App):
+    SCREENS = [('home', HomeScreen), ('difficulty', DifficultyScreen), ('game', GameScreen),
+               ('stats', StatsScreen), ('logs', LogScreen)]
+
     def build(self):
-        sm = ScreenManager()
-        screens = [
-            HomeScreen(name='home'),
-            DifficultyScreen(name='difficulty'),
-            GameScreen(name='game'),
-            StatsScreen(name='stats'),
-            LogScreen(name='logs')
-        ]
-        for screen in screens:
-            sm.add_widget(screen)
+        self.timings = {}
+        self.services_ready = threading.Event()
+        self._game_data = self._history = None
+        self.service_errors = {}  # service name -> exception that stopped it from starting
+        self.server_port = None
+        from profiler import enabled
+        self.profiler = self.start_profiling() if enabled(data_path('profile.enable')) else None
+        sm = LazyScreenManager(self.SCREENS)
+        sm.current = 'home'
         return sm
 
+    def start_profiling(self):
+        """Time Clock callbacks, touch handling, the handlers below, engine calls and storage I/O."""
+        import engine, gamerecord, history, storage, tablebase
+        from profiler import install
+        Logger.info(f"Profiler: on, trace goes to {data_path('trace.json')}")
+        return install([
+            (StyledButton, ('_update_graphics',), 'widget'),
+            (PanelButton, ('_update_graphics',), 'widget'),
+            (GameButton, ('_update_graphics', 'set_mark', 'show_analysis', 'clear_analysis'), 'widget'),
+            (GameScreen, ('setup_game', 'make_move', '_place', 'handle_game_end', 'reset_game', 'on_server_message',
+                          '_apply_ai_move', '_show_hints'), 'widget'),
+            (StatsScreen, ('on_enter',), 'widget'),
+            (LogScreen, ('add_log', 'load_older', 'on_leave'), 'widget'),
+            (LazyScreenManager, ('get_screen',), 'widget'),
+            (engine.AIEngine, ('get_move', 'analyse', 'ponder'), 'engine'),
+            (tablebase, ('get_tablebase',), 'engine'),
+            (GameData, ('save',), 'storage'),
+            (storage.JsonDocument, ('flush',), 'storage'),
+            (history.GameHistory, ('_insert',), 'storage'),  # games() is timed where it is iterated
+            (gamerecord, ('write_records',), 'storage'),
+        ])
+
+    def write_trace(self):
+        if self.profiler is None: return None
+        return self.profiler.write_trace(data_path('trace.json'))
+
     def on_start(self):
+        if self.profiler is not None:
+            from profiler import Overlay
+            self.overlay = Overlay(self.profiler)
+        # Two ticks: the first runs before the first frame is drawn, the second after it
+        Clock.schedule_once(lambda dt: Clock.schedule_once(self._after_first_frame), 0)
         if platform == 'android':
             from android.permissions import request_permissions, Permission
             request_permissions([Permission.WRITE_EXTERNAL_STORAGE, Permission.READ_EXTERNAL_STORAGE,
                                Permission.READ_MEDIA_IMAGES, Permission.READ_MEDIA_VIDEO, Permission.READ_MEDIA_AUDIO])
 
+    def _after_first_frame(self, dt):
+        self.timings['first_frame'] = time.perf_counter() - STARTED
+        threading.Thread(target=self._init_services, daemon=True).start()
+
+    def _init_services(self):
+        """Open storage and load the engine off the UI thread once the home screen is up."""
+        start = time.perf_counter()
+        try:
+            self._start_service('tablebase', self._load_tablebase)
+            self._game_data = self._start_service('game data', GameData)
+            if self._game_data is None:  # every screen shows the stats; keep them for this session only
+                Logger.warning("Startup: stats and ratings will not be saved this session")
+                self._game_data = GameData(in_memory=True)
+            self._history = self._start_service('history', self._open_history)
+            # Two-player games are played through the server; without it they stay on this device
+            self.server_port = self._start_service('game server', self._start_server)
+        finally:
+            self.timings['services'] = time.perf_counter() - start
+            self.services_ready.set()
+        data = self._game_data
+        if data is not None and self._history is not None and (data.rating_k != K_FACTOR
+                                                                or data.rating_basis != basis()):
+            data.recompute_ratings(self._history)
+        Clock.schedule_once(lambda dt: self.log_startup())
+
+    def _start_service(self, name, start):
+        try:
+            return start()
+        except Exception as e:
+            Logger.exception(f"Startup: {name} failed to start")
+            self.service_errors[name] = e
+            return None
+
+    def _load_tablebase(self):
+        import engine  # warms the module GameScreen imports
+        from tablebase import get_tablebase
+        return get_tablebase()
+
+    def _open_history(self):
+        from history import GameHistory
+        return GameHistory(data_path('game_history.db'))
+
+    def _start_server(self):
+        from server import GameServer
+        return GameServer().run_in_thread()
+
+    @property
+    def game_data(self):
+        self.services_ready.wait()  # only blocks if a screen needs it before the background load finishes
+        return self._game_data
+
+    @property
+    def history(self):
+        """The game history database, or None if it could not be opened."""
+        self.services_ready.wait()
+        return self._history
+
+    def startup_report(self):
+        """Seconds to first frame, for background service start-up, and per screen built so far."""
+        report = dict(self.timings)
+        report.update({f"screen:{name}": seconds for name, seconds in self.root.build_times.items()})
+        return report
+
+    def log_startup(self):
+        for name, seconds in self.startup_report().items():
+            Logger.info(f"Startup: {name} {seconds * 1000:.1f} ms")
+
+    def on_pause(self):
+        if self._game_data is not None: self._game_data.flush()
+        self.write_trace()  # the app may not come back from the background
+        return True
+
+    def on_stop(self):
+        self.write_trace()
+        if not self.services_ready.is_set(): return
+        if self._game_data is not None: self._game_data.flush()
+        if self._history is not None: self._history.close()
+
 if __name__ == '__main__':
     TicTacToeApp().run()
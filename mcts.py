@@ -0,0 +1,250 @@
+"""Monte Carlo tree search (UCT) engine with the same interface as AIEngine.
+
+The tree lives in the calling process and is kept between moves: when the
+next position is reached by moves the tree already holds, that subtree
+becomes the new root. Leaves are selected in batches (with virtual visits,
+so one batch spreads over different leaves) and their random playouts run
+on a process pool when ``workers`` is not 0. A playout copies the position
+into a preallocated bytearray and draws moves from a reused cell list, so
+nothing is allocated per playout; only the lines through the last stone are
+checked for a win.
+"""
+import random
+import threading
+import time
+from math import log, sqrt
+from multiprocessing import Pool, cpu_count
+
+from engine import AIEngine, SearchCancelled, get_geometry
+
+X, O = 1, 2
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Rollout:
+    """Random playouts for one board shape."""
+
+    def __init__(self, geometry, seed=None):
+        self.geometry = geometry
+        self.cells, self.win_length = geometry.cells, geometry.win_length
+        self.board = bytearray(self.cells)
+        self.start = bytearray(self.cells)
+        self.empty = [0] * self.cells
+        self.start_empty = [0] * self.cells
+        self.rng = random.Random(seed)
+        n, k = geometry.size, geometry.win_length
+        # rays[cell] holds, per direction, the cells stepping forwards and
+        # backwards from it, K - 1 at most each way.
+        self.rays = []
+        for cell in range(self.cells):
+            r, c = divmod(cell, n)
+            per_cell = []
+            for dr, dc in DIRECTIONS:
+                ray = []
+                for sign in (1, -1):
+                    ray.append(tuple((r + sign * dr * s) * n + c + sign * dc * s for s in range(1, k)
+                                     if 0 <= r + sign * dr * s < n and 0 <= c + sign * dc * s < n))
+                per_cell.append(tuple(ray))
+            self.rays.append(tuple(per_cell))
+
+    def wins(self, cell, player):
+        board, need = self.board, self.win_length - 1
+        for forward, backward in self.rays[cell]:
+            run = 0
+            for c in forward:
+                if board[c] != player: break
+                run += 1
+            for c in backward:
+                if board[c] != player: break
+                run += 1
+            if run >= need: return True
+        return False
+
+    def run(self, x, o, to_move, count):
+        """O's total score over ``count`` random games from the position (1 win, 0.5 draw)."""
+        start, start_empty, cell_bits = self.start, self.start_empty, self.geometry.cell_bits
+        free = 0
+        for cell in range(self.cells):
+            bit = cell_bits[cell]
+            start[cell] = X if x & bit else O if o & bit else 0
+            if not start[cell]:
+                start_empty[free] = cell
+                free += 1
+        board, empty, randrange, wins = self.board, self.empty, self.rng.randrange, self.wins
+        total = 0.0
+        for _ in range(count):
+            board[:] = start
+            empty[:free] = start_empty[:free]
+            left, player = free, to_move
+            while left:
+                i = randrange(left)
+                cell = empty[i]
+                left -= 1
+                empty[i] = empty[left]
+                board[cell] = player
+                if wins(cell, player):
+                    if player == O: total += 1.0
+                    break
+                player = X if player == O else O
+            else:
+                total += 0.5
+        return total
+
+
+_rollouts = {}
+
+
+def run_rollouts(task):
+    """Pool entry point: (size, win length, x, o, to_move, count, seed) -> O's total score."""
+    size, win_length, x, o, to_move, count, seed = task
+    rollout = _rollouts.get((size, win_length))
+    if rollout is None: rollout = _rollouts[(size, win_length)] = Rollout(get_geometry(size, win_length))
+    rollout.rng.seed(seed)
+    return rollout.run(x, o, to_move, count)
+
+
+class Node:
+    __slots__ = ('move', 'parent', 'children', 'untried', 'visits', 'value', 'x', 'o', 'mover', 'result')
+
+    def __init__(self, x, o, mover, move=None, parent=None, result=None):
+        self.x, self.o, self.mover, self.move, self.parent = x, o, mover, move, parent
+        self.children = []
+        self.untried = None  # filled on first visit
+        self.visits = 0
+        self.value = 0.0  # summed score for ``mover``, the side that played ``move``
+        self.result = result  # O's score if the game is over here, else None
+
+
+class MCTSEngine:
+    # Simulations per move; the search also stops at AIEngine's time budget.
+    simulations = {'easy': 300, 'medium': 2000, 'hard': 8000}
+    EXPLORATION = sqrt(2)
+    BATCH = 64  # leaves selected before their rollouts are run together
+    ROLLOUTS_PER_LEAF = 2
+    pools = {}
+
+    def __init__(self, difficulty='medium', size=3, win_length=3, workers=0, seed=None):
+        """``workers`` is the rollout pool size: 0 runs playouts in this
+        process, None uses every core.
+        """
+        self.geometry = get_geometry(size, win_length)
+        self.difficulty = difficulty
+        self.budget = self.simulations[difficulty]
+        self.time_budget = AIEngine.time_budgets[difficulty]
+        self.workers = cpu_count() if workers is None else workers
+        self.rng = random.Random(seed)
+        self.rollout = Rollout(self.geometry, self.rng.random())
+        self.root = None
+        self.lock = threading.Lock()
+        self.cancel = None
+        self.completed_depth = None
+        self.nodes = self.reused = 0
+
+    def get_move(self, board, cancel=None):
+        """Pick a cell index for 'O' on a list board, or None if it is full."""
+        x, o = self.geometry.to_bits(board)
+        with self.lock:
+            self.cancel = cancel
+            try:
+                return self.best_move(x, o)
+            finally:
+                self.cancel = None
+
+    def search_stats(self):
+        return {'nodes': self.nodes, 'reused': self.reused, 'depth': self.completed_depth}
+
+    def best_move(self, x, o, player='O'):
+        geometry = self.geometry
+        self.nodes = self.reused = 0
+        self.completed_depth = None
+        mover, opponent = (o, x) if player == 'O' else (x, o)
+        moves = geometry.candidate_cells(x, o)
+        if not moves: return None
+        # Immediate wins and forced blocks need no search
+        for pos in moves:
+            if geometry.wins_at(mover | geometry.cell_bits[pos], pos): return pos
+        for pos in moves:
+            if geometry.wins_at(opponent | geometry.cell_bits[pos], pos): return pos
+        root = self._reuse(x, o)
+        if root is None: root = Node(x, o, X if player == 'O' else O)
+        self.reused = root.visits
+        deadline = time.monotonic() + self.time_budget
+        while self.nodes < self.budget and time.monotonic() < deadline:
+            if self.cancel is not None and self.cancel.is_set(): raise SearchCancelled
+            self._run_batch(root, min(self.BATCH, self.budget - self.nodes))
+        best = max(root.children, key=lambda child: child.visits)
+        self.root = best  # the opponent's reply will be looked up under it
+        best.parent = None
+        return best.move
+
+    def _reuse(self, x, o):
+        """The kept subtree for position (x, o), or None if it is not below the old root."""
+        node, cell_bits = self.root, self.geometry.cell_bits
+        while node is not None and (node.x, node.o) != (x, o):
+            if node.x & ~x or node.o & ~o: return None
+            node = next((child for child in node.children
+                         if (x if child.mover == X else o) & cell_bits[child.move]), None)
+        if node is not None: node.parent = None
+        return node
+
+    def _select(self, node):
+        """Walk to a leaf by UCT, expanding one child, adding a virtual visit on the way."""
+        geometry, c = self.geometry, self.EXPLORATION
+        while True:
+            node.visits += 1
+            if node.result is not None: return node
+            if node.untried is None:
+                node.untried = geometry.candidate_cells(node.x, node.o)
+                self.rng.shuffle(node.untried)
+            if node.untried:
+                return self._expand(node, node.untried.pop())
+            log_visits = log(node.visits)
+            node = max(node.children, key=lambda child: child.value / child.visits
+                       + c * sqrt(log_visits / child.visits) if child.visits else float('inf'))
+
+    def _expand(self, node, pos):
+        geometry, bit = self.geometry, self.geometry.cell_bits[pos]
+        mover = O if node.mover == X else X
+        x, o = (node.x | bit, node.o) if mover == X else (node.x, node.o | bit)
+        result = None
+        if geometry.wins_at(x if mover == X else o, pos): result = 1.0 if mover == O else 0.0
+        elif x | o == geometry.full: result = 0.5
+        child = Node(x, o, mover, pos, node, result)
+        child.visits = 1
+        node.children.append(child)
+        return child
+
+    def _run_batch(self, root, size):
+        leaves = [self._select(root) for _ in range(size)]
+        tasks = [(self.geometry.size, self.geometry.win_length, leaf.x, leaf.o,
+                  O if leaf.mover == X else X, self.ROLLOUTS_PER_LEAF, self.rng.getrandbits(32))
+                 for leaf in leaves if leaf.result is None]
+        totals = iter(self._rollouts(tasks))
+        depth = 0
+        for leaf in leaves:
+            score = leaf.result if leaf.result is not None else next(totals) / self.ROLLOUTS_PER_LEAF
+            node, d = leaf, 0
+            while node is not None:
+                node.value += score if node.mover == O else 1.0 - score
+                node, d = node.parent, d + 1
+            depth = max(depth, d - 1)
+        self.nodes += size
+        self.completed_depth = max(self.completed_depth or 0, depth)
+
+    def _rollouts(self, tasks):
+        if not self.workers:
+            results = []
+            for size, win_length, x, o, to_move, count, seed in tasks:
+                self.rollout.rng.seed(seed)
+                results.append(self.rollout.run(x, o, to_move, count))
+            return results
+        pool = MCTSEngine.pools.get(self.workers)
+        if pool is None: pool = MCTSEngine.pools[self.workers] = Pool(self.workers)
+        return pool.map(run_rollouts, tasks, chunksize=max(1, len(tasks) // (self.workers * 2)))
+
+    @classmethod
+    def shutdown(cls):
+        """Stop every rollout pool."""
+        for pool in cls.pools.values():
+            pool.terminate()
+        cls.pools.clear()
@@ -0,0 +1,53 @@
+"""Thread-friendly client for server.py.
+
+The connection runs on an asyncio loop in a daemon thread, so a UI thread
+can call ``send`` without blocking. Every message from the server is passed
+to ``on_message`` on that loop's thread; the app hops back to its own
+thread with ``Clock.schedule_once``.
+"""
+import asyncio
+import json
+import threading
+
+
+class GameClient:
+    def __init__(self, host, port, on_message, on_close=None):
+        self.on_message, self.on_close = on_message, on_close
+        self.loop = asyncio.new_event_loop()
+        self.writer = None
+        connected = threading.Event()
+        self.error = None
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            try:
+                reader, self.writer = self.loop.run_until_complete(asyncio.open_connection(host, port))
+            except OSError as e:
+                self.error = e
+                connected.set()
+                return
+            connected.set()
+            self.loop.run_until_complete(self._read(reader))
+        threading.Thread(target=run, daemon=True, name='game-client').start()
+        connected.wait()
+        if self.error is not None: raise self.error
+
+    async def _read(self, reader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                self.on_message(json.loads(line))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.writer.close()
+            if self.on_close is not None: self.on_close()
+
+    def send(self, message):
+        """Queue ``message`` for the server; safe to call from any thread."""
+        data = (json.dumps(message, separators=(',', ':')) + '\n').encode()
+        self.loop.call_soon_threadsafe(self.writer.write, data)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.writer.close)
@@ -0,0 +1,230 @@
+"""Opt-in timing of the UI thread and the work it waits on.
+
+``install`` wraps Clock callbacks, chosen methods (widget handlers, engine
+calls, storage writes) and touch dispatch with timers that record Chrome
+trace events; nothing is patched unless it is called. ``Overlay`` shows
+FPS, frame times and the slowest callback of the last second, and
+``write_trace`` saves everything as Chrome trace JSON for chrome://tracing
+or https://ui.perfetto.dev.
+
+Enable with ``TICTACTOE_PROFILE=1`` or by creating ``profile.enable`` in the
+app's data directory (the file is easy to create on a device over adb).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+MAX_EVENTS = 200000  # oldest events are dropped past this, so a long session stays bounded
+SLOW_MS = 16.7  # one frame at 60 Hz
+
+_now = time.perf_counter
+
+
+class Profiler:
+    def __init__(self, max_events=MAX_EVENTS):
+        self.origin = _now()
+        self.events = deque(maxlen=max_events)
+        self.threads = {}
+        self.lock = threading.Lock()
+        self.slowest = None  # (seconds, name) since the overlay last took it
+        self.frames = deque(maxlen=600)  # recent frame times in seconds
+
+    def record(self, name, cat, start, duration, args=None):
+        thread = threading.current_thread()
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6,
+                 'pid': os.getpid(), 'tid': thread.ident}
+        if args: event['args'] = args
+        with self.lock:
+            self.events.append(event)
+            self.threads[thread.ident] = thread.name
+            if thread is threading.main_thread() and (self.slowest is None or duration > self.slowest[0]):
+                self.slowest = (duration, name)
+
+    def counter(self, name, values):
+        with self.lock:
+            self.events.append({'name': name, 'ph': 'C', 'ts': (_now() - self.origin) * 1e6,
+                                'pid': os.getpid(), 'args': values})
+
+    def span(self, name, cat='app'):
+        """Context manager timing the ``with`` block."""
+        return _Span(self, name, cat)
+
+    def wrap(self, fn, name, cat):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = _now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, cat, start, _now() - start)
+        timed.__profiled__ = True
+        return timed
+
+    def instrument(self, owner, names, cat):
+        """Replace ``owner``'s (a class or module) ``names`` with timed versions, in place."""
+        prefix = getattr(owner, '__qualname__', owner.__name__)
+        for attr in names:
+            fn = getattr(owner, attr)
+            if getattr(fn, '__profiled__', False): continue
+            setattr(owner, attr, self.wrap(fn, f"{prefix}.{attr}", cat))
+
+    def frame(self, dt):
+        self.frames.append(dt)
+        self.counter('frame', {'ms': dt * 1000})
+
+    def take_slowest(self):
+        with self.lock:
+            slowest, self.slowest = self.slowest, None
+        return slowest
+
+    def trace(self):
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        pid = os.getpid()
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in threads.items()]
+        return {'traceEvents': names + events, 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, path):
+        from storage import write_atomic
+        write_atomic(path, json.dumps(self.trace(), separators=(',', ':')))
+        return path
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'cat', 'start')
+
+    def __init__(self, profiler, name, cat):
+        self.profiler, self.name, self.cat = profiler, name, cat
+
+    def __enter__(self):
+        self.start = _now()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.cat, self.start, _now() - self.start)
+
+
+class TimedCallback:
+    """A Clock callback that records how long it ran. Compares equal to the
+    callback it wraps, so ``Clock.unschedule(callback)`` still finds it.
+    """
+    __slots__ = ('callback', 'name', 'profiler')
+
+    def __init__(self, profiler, callback):
+        self.profiler, self.callback = profiler, callback
+        self.name = getattr(callback, '__qualname__', None) or repr(callback)
+
+    def __call__(self, *args):
+        start = _now()
+        try:
+            return self.callback(*args)
+        finally:
+            self.profiler.record(self.name, 'clock', start, _now() - start)
+
+    def __eq__(self, other):
+        return self.callback == (other.callback if isinstance(other, TimedCallback) else other)
+
+    def __hash__(self):
+        return hash(self.callback)
+
+
+def _patch_clock(profiler):
+    from kivy.clock import Clock
+    for method in ('schedule_once', 'schedule_interval', 'create_trigger'):
+        original = getattr(Clock, method)
+
+        def schedule(callback, *args, _original=original, **kwargs):
+            if not isinstance(callback, TimedCallback): callback = TimedCallback(profiler, callback)
+            return _original(callback, *args, **kwargs)
+        setattr(Clock, method, schedule)
+
+
+_profiler = None
+
+
+def get_profiler():
+    """The installed profiler, or None when profiling is off."""
+    return _profiler
+
+
+def span(name, cat='app'):
+    """Time a ``with`` block when profiling is on; does nothing otherwise."""
+    return _profiler.span(name, cat) if _profiler is not None else nullcontext()
+
+
+def enabled(flag_path='profile.enable'):
+    if os.environ.get('TICTACTOE_PROFILE', '') not in ('', '0'): return True
+    return os.path.exists(flag_path)
+
+
+def install(targets=()):
+    """Start profiling: time every Clock callback, touch dispatch and each
+    (owner, names, category) in ``targets``. Safe to call more than once.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+        _patch_clock(_profiler)
+        from kivy.core.window import WindowBase
+        _profiler.instrument(WindowBase, ('on_touch_down', 'on_touch_move', 'on_touch_up', 'on_resize'), 'input')
+    for owner, names, cat in targets:
+        _profiler.instrument(owner, names, cat)
+    return _profiler
+
+
+class Overlay:
+    """FPS, frame-time and slowest-callback readout drawn above every screen."""
+
+    def __init__(self, profiler, interval=0.5):
+        from kivy.clock import Clock
+        from kivy.core.window import Window
+        from kivy.graphics import Color, Rectangle
+        from kivy.metrics import dp
+        from kivy.uix.label import Label
+        self.profiler = profiler
+        self.label = Label(text='', font_size=dp(12), color=(1, 1, 1, 1), size_hint=(None, None),
+                           halign='left', valign='top', padding=(dp(6), dp(4)))
+        self.label.bind(texture_size=self._resize)
+        with self.label.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self.bg = Rectangle()
+        Window.add_widget(self.label)
+        Window.bind(size=self._place)
+        self.window = Window
+        self.frame_event = Clock.schedule_interval(profiler.frame, 0)
+        self.update_event = Clock.schedule_interval(self.update, interval)
+        self.worst = None  # slowest callback over the last second
+
+    def _resize(self, label, size):
+        label.size = size
+        self._place()
+
+    def _place(self, *args):
+        self.label.pos = (0, self.window.height - self.label.height)
+        self.bg.pos, self.bg.size = self.label.pos, self.label.size
+
+    def update(self, dt):
+        frames = list(self.profiler.frames)[-60:]
+        slowest = self.profiler.take_slowest()
+        if slowest is not None and (self.worst is None or slowest[0] > self.worst[0]
+                                    or _now() - self.worst[2] > 1.0):
+            self.worst = (slowest[0], slowest[1], _now())
+        if not frames: return
+        average = sum(frames) / len(frames)
+        lines = [f"{1 / average if average else 0:.0f} FPS  frame {average * 1000:.1f} ms  "
+                 f"max {max(frames) * 1000:.1f} ms"]
+        if self.worst is not None:
+            seconds, name = self.worst[0], self.worst[1]
+            lines.append(f"{'SLOW ' if seconds * 1000 > SLOW_MS else ''}{name} {seconds * 1000:.1f} ms")
+        self.label.text = '\n'.join(lines)
+
+    def remove(self):
+        self.frame_event.cancel()
+        self.update_event.cancel()
+        self.window.remove_widget(self.label)
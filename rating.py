@@ -0,0 +1,136 @@
+"""Elo ratings for games against the AI.
+
+``GameData.ratings[difficulty]`` is the player's rating measured against that
+difficulty. Each AI level has a fixed rating per board shape in
+``AI_RATINGS``, and only games on a calibrated shape change the player's
+rating. A rating can be updated one game at a time, or rebuilt in a single
+streaming pass over the game history (for an import or a K-factor change).
+
+The AI ratings come from ``calibrate``: headless self-play between the levels
+and a random player anchored at ``RANDOM_RATING``. That only measures a
+difference where the levels beat each other. On 3x3 and 4x4 their mistakes
+only show against an opponent who sets up forks, which neither the random
+player nor another level does, so self-play between them is all draws and
+those shapes are left uncalibrated. On 5x5 with four in a row the shallower
+levels lose to the deeper ones.
+
+    python rating.py calibrate -n 200 --size 5 --win 4
+    python rating.py recompute game_history.db --k 24
+"""
+import argparse
+import math
+
+K_FACTOR = 32
+INITIAL_RATING = 1200
+RANDOM_RATING = 800
+DIFFICULTIES = ('easy', 'medium', 'hard')
+# (size, win length) -> output of `python rating.py calibrate` on that shape.
+AI_RATINGS = {
+    (5, 4): {'easy': 1756, 'medium': 1793, 'hard': 1833},  # -n 200
+}
+CALIBRATION_PLAYERS = ('random', 'easy', 'medium', 'hard')
+PRIOR_DRAWS = 1  # virtual draws per pairing, so a perfect score still gives a finite rating gap
+SCORES = {'X': 1.0, 'draw': 0.5, 'O': 0.0}  # the human always plays X
+
+
+def expected(rating, opponent):
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+def update(rating, opponent, score, k=K_FACTOR):
+    return rating + k * (score - expected(rating, opponent))
+
+
+def update_for_game(ratings, difficulty, result, size, win_length, k=K_FACTOR):
+    """Apply one finished AI game to ``ratings`` in place; returns the new rating,
+    or None when the board shape has no AI ratings and nothing changed.
+    """
+    opponents = AI_RATINGS.get((size, win_length))
+    if opponents is None or difficulty not in opponents: return None
+    rating = ratings.get(difficulty, INITIAL_RATING)
+    ratings[difficulty] = update(rating, opponents[difficulty], SCORES[result], k)
+    return ratings[difficulty]
+
+
+def replay(games, k=K_FACTOR):
+    """Ratings rebuilt from an iterable of history rows, oldest first, one row at a time."""
+    ratings = {difficulty: INITIAL_RATING for difficulty in DIFFICULTIES}
+    for game in games:
+        if game['mode'] == 'ai':
+            update_for_game(ratings, game['difficulty'], game['result'], game['size'], game['win_length'], k)
+    return ratings
+
+
+def basis():
+    """``AI_RATINGS`` in a JSON-safe form, stored with player ratings computed against it."""
+    return [[size, win_length, AI_RATINGS[(size, win_length)]] for size, win_length in sorted(AI_RATINGS)]
+
+
+def fit_ratings(scores, anchor='random', anchor_rating=RANDOM_RATING, iterations=2000):
+    """Maximum-likelihood ratings from {(a, b): (points for a, games)}, with ``anchor`` fixed."""
+    players = {p for pair in scores for p in pair}
+    ratings = {p: anchor_rating for p in players}
+    for _ in range(iterations):
+        for player in players - {anchor}:
+            actual = expect = games_played = 0.0
+            for (a, b), (points, games) in scores.items():
+                if player not in (a, b): continue
+                other = b if player == a else a
+                actual += points if player == a else games - points
+                expect += games * expected(ratings[player], ratings[other])
+                games_played += games
+            # Newton step on the logistic log-likelihood, clamped so a
+            # perfect score cannot run away to infinity.
+            slope = max(games_played * 0.25, 1.0) * math.log(10) / 400
+            ratings[player] += max(-50.0, min(50.0, (actual - expect) / slope))
+    return {p: round(r) for p, r in ratings.items()}
+
+
+def calibrate(games=200, opening=2, size=5, win_length=4, workers=None):
+    """Rate every difficulty on one board shape from self-play against each other
+    and a random player. Searches run at fixed depth, so the result does not
+    depend on the machine's speed.
+    """
+    from selfplay import run_match
+    players = CALIBRATION_PLAYERS
+    scores = {}
+    for i, first in enumerate(players):
+        for second in players[i + 1:]:
+            summary = run_match(first, second, games, size, win_length, iterative=False, opening=opening,
+                                workers=workers)
+            points = (summary['win_rate'] + summary['draw_rate'] / 2) * summary['games']
+            scores[(first, second)] = (points + PRIOR_DRAWS / 2, summary['games'] + PRIOR_DRAWS)
+    return fit_ratings(scores)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Elo tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    cal = commands.add_parser('calibrate', help="estimate AI ratings from self-play")
+    cal.add_argument('-n', '--games', type=int, default=200, help="games per pairing")
+    cal.add_argument('--opening', type=int, default=2, help="random plies at the start of each game")
+    cal.add_argument('--size', type=int, default=5)
+    cal.add_argument('--win', type=int, default=4)
+    cal.add_argument('--workers', type=int, default=None)
+    rec = commands.add_parser('recompute', help="rebuild player ratings from the game history")
+    rec.add_argument('database')
+    rec.add_argument('--k', type=float, default=K_FACTOR)
+    args = parser.parse_args(argv)
+    if args.command == 'calibrate':
+        print(f"{args.size}x{args.size}, {args.win} in a row:")
+        for player, rating in sorted(calibrate(args.games, args.opening, args.size, args.win, args.workers).items(),
+                                     key=lambda item: item[1]):
+            print(f"{player:>8}: {rating}")
+    else:
+        from history import GameHistory
+        history = GameHistory(args.database)
+        try:
+            ratings = replay(history.games(mode='ai', newest_first=False), args.k)
+        finally:
+            history.close()
+        for difficulty, rating in ratings.items():
+            print(f"{difficulty:>8}: {rating:.0f}")
+
+
+if __name__ == '__main__':
+    main()
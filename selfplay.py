@@ -0,0 +1,137 @@
+"""Headless self-play harness for AIEngine.
+
+Plays two players against each other across a multiprocessing pool and
+reports win/draw/loss rates and engine throughput. Only ``engine`` is
+imported, so this runs on a machine without Kivy or a display:
+
+    python selfplay.py hard random -n 500
+    python selfplay.py medium easy -n 200 --size 5 --win 4 --workers 8
+
+Engines are deterministic, so ``--opening N`` plays the first N plies at
+random to get more than two distinct games out of an engine-vs-engine match.
+"""
+import argparse
+import json
+import random
+import time
+from multiprocessing import Pool, cpu_count
+
+from engine import AIEngine, get_geometry
+
+PLAYERS = ('random', 'easy', 'medium', 'hard', 'mcts-easy', 'mcts-medium', 'mcts-hard')
+
+
+def make_player(spec, size, win_length, iterative, seed=None):
+    if spec == 'random': return None
+    if spec.startswith('mcts-'):
+        from mcts import MCTSEngine
+        return MCTSEngine(spec[len('mcts-'):], size, win_length, workers=0, seed=seed)  # games already run in parallel
+    return AIEngine(spec, size, win_length, iterative=iterative)
+
+
+def play_game(task):
+    """Play one game; ``task`` is (first_side, x_spec, o_spec, size, win_length, iterative, opening, seed)."""
+    first_side, x_spec, o_spec, size, win_length, iterative, opening, seed = task
+    geometry = get_geometry(size, win_length)
+    rng = random.Random(seed)
+    players = {'X': make_player(x_spec, size, win_length, iterative, seed),
+               'O': make_player(o_spec, size, win_length, iterative, seed)}
+    think = {'X': 0.0, 'O': 0.0}
+    nodes = {'X': 0, 'O': 0}
+    engine_moves = {'X': 0, 'O': 0}
+    x = o = 0
+    turn, result, moves = 'X', 'draw', []
+    while x | o != geometry.full:
+        engine = players[turn]
+        if engine is None or len(moves) < opening:
+            move = rng.choice(geometry.empty_cells(x, o))
+        else:
+            start = time.perf_counter()
+            move = engine.best_move(x, o, turn)
+            think[turn] += time.perf_counter() - start
+            nodes[turn] += engine.nodes
+            engine_moves[turn] += 1
+        moves.append(move)
+        if turn == 'X': x |= geometry.cell_bits[move]
+        else: o |= geometry.cell_bits[move]
+        if geometry.wins_at(x if turn == 'X' else o, move):
+            result = turn
+            break
+        turn = 'O' if turn == 'X' else 'X'
+    return {'x': x_spec, 'o': o_spec, 'first_side': first_side, 'result': result, 'moves': moves,
+            'think': think, 'nodes': nodes, 'engine_moves': engine_moves}
+
+
+def run_match(first, second, games, size=3, win_length=3, iterative=True, opening=0, workers=None, seed=0):
+    """Play ``games`` games, alternating colours, and summarise them from ``first``'s side."""
+    tasks = []
+    for i in range(games):
+        if i % 2 == 0: tasks.append(('X', first, second, size, win_length, iterative, opening, seed + i))
+        else: tasks.append(('O', second, first, size, win_length, iterative, opening, seed + i))
+    start = time.perf_counter()
+    with Pool(workers or cpu_count()) as pool:
+        records = list(pool.imap_unordered(play_game, tasks, chunksize=max(1, games // 64)))
+    wall = time.perf_counter() - start
+    return summarise(first, second, records, wall)
+
+
+def summarise(first, second, records, wall):
+    wins = draws = losses = 0
+    think = {first: 0.0, second: 0.0}
+    nodes = {first: 0, second: 0}
+    engine_moves = {first: 0, second: 0}
+    total_moves = 0
+    for record in records:
+        total_moves += len(record['moves'])
+        if record['result'] == 'draw': draws += 1
+        elif record['result'] == record['first_side']: wins += 1
+        else: losses += 1
+        for side in ('X', 'O'):
+            spec = record[side.lower()]
+            think[spec] += record['think'][side]
+            nodes[spec] += record['nodes'][side]
+            engine_moves[spec] += record['engine_moves'][side]
+    games = len(records)
+    engines = {}
+    for spec in {first, second}:
+        if spec == 'random': continue
+        engines[spec] = {
+            'moves': engine_moves[spec],
+            'moves_per_sec': engine_moves[spec] / think[spec] if think[spec] else 0.0,
+            'nodes_per_sec': nodes[spec] / think[spec] if think[spec] else 0.0,
+        }
+    return {'first': first, 'second': second, 'games': games,
+            'win_rate': wins / games, 'draw_rate': draws / games, 'loss_rate': losses / games,
+            'wall_seconds': wall, 'games_per_sec': games / wall if wall else 0.0,
+            'moves_per_sec': total_moves / wall if wall else 0.0, 'engines': engines}
+
+
+def format_summary(summary):
+    lines = [f"{summary['first']} vs {summary['second']}: {summary['games']} games in {summary['wall_seconds']:.2f}s",
+             f"  win {summary['win_rate']:.1%}  draw {summary['draw_rate']:.1%}  loss {summary['loss_rate']:.1%}",
+             f"  {summary['games_per_sec']:.1f} games/s, {summary['moves_per_sec']:.1f} moves/s overall"]
+    for spec, stats in sorted(summary['engines'].items()):
+        lines.append(f"  {spec}: {stats['moves_per_sec']:.1f} moves/s, {stats['nodes_per_sec']:.0f} nodes/s")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless AIEngine self-play")
+    parser.add_argument('first', choices=PLAYERS)
+    parser.add_argument('second', choices=PLAYERS)
+    parser.add_argument('-n', '--games', type=int, default=100)
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--win', type=int, default=None, help="win length, defaults to the board size")
+    parser.add_argument('--fixed-depth', action='store_true', help="disable iterative deepening")
+    parser.add_argument('--opening', type=int, default=0, help="random plies before the players take over")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args(argv)
+    summary = run_match(args.first, args.second, args.games, args.size, args.win or args.size,
+                        not args.fixed_depth, args.opening, args.workers, args.seed)
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+
+
+if __name__ == '__main__':
+    main()
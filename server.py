@@ -0,0 +1,236 @@
+"""Asyncio game server: many concurrent matches in one process.
+
+Clients speak newline-delimited JSON over TCP. Every match is a
+``GameSession``; the server is the only one applying moves, and sends the
+full state to every seat after each change. AI moves run on an executor so
+searches never block the event loop.
+
+Requests (``game`` is the id the server returned in ``joined``):
+
+    {"op": "new", "mode": "ai", "difficulty": "easy", "size": 3, "win": 3}
+    {"op": "new", "mode": "pvp", "seat": "both"}     # hot seat over the network
+    {"op": "join", "game": 7}                        # take O in a pvp match
+    {"op": "move", "game": 7, "cell": 4}
+    {"op": "leave", "game": 7}
+
+Replies are ``joined``, ``state``, ``left`` and ``error`` messages.
+
+    python server.py --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from engine import AIEngine
+from session import GameSession, IllegalMove
+
+DEFAULT_PORT = 8765
+MAX_LINE = 4096
+MAX_SIZE = 15
+DIFFICULTIES = tuple(AIEngine.time_budgets)
+
+_engines = {}
+
+
+def ai_move(difficulty, size, win_length, moves):
+    """Executor entry point: the AI's (cell, depth) after ``moves``. Fixed depth keeps the
+    cost of a move bounded, and each worker keeps one engine per level and board.
+    """
+    key = (difficulty, size, win_length)
+    engine = _engines.get(key)
+    if engine is None: engine = _engines[key] = AIEngine(difficulty, size, win_length, iterative=False)
+    session = GameSession(size, win_length)
+    for cell in moves: session.play(cell)
+    return engine.get_move(session.board()), engine.completed_depth
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.games = set()
+
+    async def send(self, message):
+        self.writer.write((json.dumps(message, separators=(',', ':')) + '\n').encode())
+        await self.writer.drain()
+
+
+class Match:
+    def __init__(self, game_id, session, difficulty=None):
+        self.id, self.session, self.difficulty = game_id, session, difficulty
+        self.seats = {'X': None, 'O': 'ai' if difficulty else None}  # Connection, 'ai' or None
+
+    def connections(self):
+        return {seat for seat in self.seats.values() if isinstance(seat, Connection)}
+
+
+class GameServer:
+    def __init__(self, executor=None):
+        self.executor = executor
+        self.matches = {}
+        self.next_id = 1
+        self.server = None
+        self.port = None
+        self.moves = 0  # applied moves, for throughput reports
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    def run_in_thread(self, host='127.0.0.1', port=0):
+        """Serve from an event loop on a daemon thread; returns the bound port once listening."""
+        ready = threading.Event()
+        failed = []
+
+        def serve():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start(host, port))
+            except OSError as e:
+                failed.append(e)
+                return
+            finally:
+                ready.set()
+            loop.run_forever()
+        threading.Thread(target=serve, daemon=True, name='game-server').start()
+        ready.wait()
+        if failed: raise failed[0]
+        return self.port
+
+    async def handle(self, reader, writer):
+        conn = Connection(reader, writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):  # over-long line or reset
+                    break
+                if not line: break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict): raise ValueError("expected an object")
+                    await self.dispatch(conn, message)
+                except (ValueError, KeyError, TypeError) as e:
+                    await conn.send({'op': 'error', 'message': str(e)})
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in list(conn.games):
+                await self.leave(conn, game_id)
+            writer.close()
+
+    async def dispatch(self, conn, message):
+        op = message.get('op')
+        if op == 'new': await self.new_match(conn, message)
+        elif op == 'join': await self.join(conn, self.match(message))
+        elif op == 'move': await self.move(conn, self.match(message), message['cell'])
+        elif op == 'leave': await self.leave(conn, message['game'])
+        else: raise ValueError(f"unknown op {op!r}")
+
+    def match(self, message):
+        match = self.matches.get(message.get('game'))
+        if match is None: raise ValueError(f"no game {message.get('game')!r}")
+        return match
+
+    async def new_match(self, conn, message):
+        mode = message.get('mode', 'pvp')
+        difficulty = message.get('difficulty', 'medium') if mode == 'ai' else None
+        if mode not in ('ai', 'pvp'): raise ValueError(f"unknown mode {mode!r}")
+        if difficulty is not None and difficulty not in DIFFICULTIES:
+            raise ValueError(f"unknown difficulty {difficulty!r}")
+        size = int(message.get('size', 3))
+        if not 3 <= size <= MAX_SIZE: raise ValueError(f"board size must be 3 to {MAX_SIZE}")
+        session = GameSession(size, int(message.get('win', size)))
+        match = Match(self.next_id, session, difficulty)
+        self.next_id += 1
+        self.matches[match.id] = match
+        match.seats['X'] = conn
+        if mode == 'pvp' and message.get('seat') == 'both': match.seats['O'] = conn
+        conn.games.add(match.id)
+        await conn.send({'op': 'joined', 'game': match.id,
+                         'seats': [seat for seat, holder in match.seats.items() if holder is conn]})
+        await self.broadcast(match)
+
+    async def join(self, conn, match):
+        if match.seats['O'] is not None: raise ValueError(f"game {match.id} is full")
+        match.seats['O'] = conn
+        conn.games.add(match.id)
+        await conn.send({'op': 'joined', 'game': match.id, 'seats': ['O']})
+        await self.broadcast(match)
+
+    async def move(self, conn, match, cell):
+        session = match.session
+        if match.seats[session.turn] is not conn: raise ValueError("not your turn")
+        try:
+            session.play(cell)
+        except IllegalMove as e:
+            raise ValueError(str(e)) from None
+        self.moves += 1
+        await self.broadcast(match)
+        if not session.over and match.seats[session.turn] == 'ai':
+            loop = asyncio.get_running_loop()
+            cell, depth = await loop.run_in_executor(self.executor, ai_move, match.difficulty,
+                                                     session.geometry.size, session.geometry.win_length,
+                                                     list(session.moves))
+            if match.id not in self.matches: return  # everyone left while it was thinking
+            session.play(cell, depth=depth)
+            self.moves += 1
+            await self.broadcast(match)
+        if session.over: self.finish(match)
+
+    def finish(self, match):
+        """Forget a finished match; its players start a new one."""
+        self.matches.pop(match.id, None)
+        for conn in match.connections():
+            conn.games.discard(match.id)
+
+    async def leave(self, conn, game_id):
+        conn.games.discard(game_id)
+        match = self.matches.get(game_id)
+        if match is None: return
+        for seat, holder in match.seats.items():
+            if holder is conn: match.seats[seat] = None
+        others = match.connections()
+        if not others:
+            del self.matches[game_id]
+            return
+        for other in others:
+            await other.send({'op': 'left', 'game': game_id})
+
+    async def broadcast(self, match):
+        state = dict(match.session.state(), op='state', game=match.id)
+        for conn in match.connections():
+            try:
+                await conn.send(state)
+            except ConnectionError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tic Tac Toe game server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None, help="AI executor size, defaults to the CPU count")
+    parser.add_argument('--threads', action='store_true', help="run AI moves on threads instead of processes")
+    args = parser.parse_args(argv)
+    executor = (ThreadPoolExecutor if args.threads else ProcessPoolExecutor)(args.workers)
+
+    async def serve():
+        server = GameServer(executor)
+        await server.start(args.host, args.port)
+        print(f"Serving on {args.host}:{server.port}")
+        async with server.server:
+            await server.server.serve_forever()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+if __name__ == '__main__':
+    main()
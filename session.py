@@ -0,0 +1,62 @@
+"""Headless game session: the rules of one game, with no widgets.
+
+``GameScreen`` draws a session and the network server hosts thousands of
+them; both apply moves through ``play`` and read the outcome from
+``result``. X always moves first.
+"""
+from engine import get_geometry
+
+
+class IllegalMove(ValueError):
+    """A move that is off the board, on an occupied cell, out of turn or after the game ended."""
+
+
+class GameSession:
+    def __init__(self, size=3, win_length=3):
+        self.geometry = get_geometry(size, win_length)
+        self.reset()
+
+    def reset(self):
+        self.x = self.o = 0
+        self.moves = []
+        self.depths = []  # per move, the depth the AI's search completed; None for other moves
+        self.nodes = []  # per move, where the clock stopped the AI's search; None if it finished
+        self.pondered = []  # plies whose AI move was found while the player was thinking
+        self.turn = 'X'
+        self.result = None  # 'X', 'O' or 'draw' once the game is over
+
+    @property
+    def over(self):
+        return self.result is not None
+
+    def board(self):
+        """The position as a list of 'X'/'O'/'' marks."""
+        bits = self.geometry.cell_bits
+        return ['X' if self.x & bit else 'O' if self.o & bit else '' for bit in bits]
+
+    def legal(self, cell, player=None):
+        return (type(cell) is int and self.result is None and (player is None or player == self.turn)  # not bool
+                and 0 <= cell < self.geometry.cells and not (self.x | self.o) & self.geometry.cell_bits[cell])
+
+    def play(self, cell, player=None, depth=None, nodes=None, pondered=False):
+        """Place the mover's mark on ``cell``; returns the result if the move ended the game.
+        Only the lines through ``cell`` are checked for a win.
+        """
+        if not self.legal(cell, player):
+            raise IllegalMove(f"{self.turn} cannot play {cell!r}")
+        geometry, bit = self.geometry, self.geometry.cell_bits[cell]
+        if self.turn == 'X': self.x |= bit
+        else: self.o |= bit
+        self.moves.append(cell)
+        self.depths.append(depth)
+        self.nodes.append(nodes)
+        if pondered: self.pondered.append(len(self.moves) - 1)
+        if geometry.wins_at(self.x if self.turn == 'X' else self.o, cell): self.result = self.turn
+        elif self.x | self.o == geometry.full: self.result = 'draw'
+        else: self.turn = 'O' if self.turn == 'X' else 'X'
+        return self.result
+
+    def state(self):
+        """JSON-ready snapshot for clients."""
+        return {'size': self.geometry.size, 'win': self.geometry.win_length, 'moves': list(self.moves),
+                'turn': self.turn, 'result': self.result}
@@ -0,0 +1,85 @@
+"""Batched, atomic JSON persistence.
+
+``JsonDocument`` keeps the whole file in memory. ``put`` only marks it dirty
+and arms a timer; every change made before the timer fires goes out in one
+write on the timer thread, away from the UI thread. The file is written to a
+temporary file and moved into place with ``os.replace``, so a crash mid-write
+leaves the previous contents intact. The on-disk layout is the same
+``{"key": {...}}`` mapping JsonStore used, so existing files keep loading.
+A document with no path lives in memory only.
+"""
+import json
+import os
+import threading
+
+
+def load_json(path):
+    """Mapping stored at ``path``; missing, empty or corrupt files read as empty."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class JsonDocument:
+    _open = {}
+    _open_lock = threading.Lock()
+
+    def __init__(self, path, delay=2.0):
+        self.path = path
+        self.delay = delay
+        self.data = load_json(path) if path is not None else {}
+        self.dirty = False
+        self.lock = threading.Lock()  # guards data, dirty and timer
+        self.write_lock = threading.Lock()  # one writer per temp file
+        self.timer = None
+
+    @classmethod
+    def open(cls, path, delay=2.0):
+        """Shared document for ``path`` so every reader sees unflushed changes."""
+        path = os.path.abspath(path)
+        with cls._open_lock:
+            if path not in cls._open: cls._open[path] = cls(path, delay)
+            return cls._open[path]
+
+    def get(self, key, default=None):
+        with self.lock:
+            value = self.data.get(key)
+        if value is None: return default
+        return dict(value) if isinstance(value, dict) else value
+
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = dict(value) if isinstance(value, dict) else value
+            self.dirty = True
+            if self.timer is None and self.path is not None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Write pending changes now; called by the timer and on app pause/stop."""
+        with self.write_lock:
+            with self.lock:
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                if not self.dirty or self.path is None: return
+                text = json.dumps(self.data)
+                self.dirty = False
+            try:
+                write_atomic(self.path, text)
+            except OSError:
+                with self.lock: self.dirty = True
+                raise
@@ -0,0 +1,142 @@
+"""Perfect-play tablebase for 3x3 tic-tac-toe.
+
+Run ``python tablebase.py`` to retro-solve every reachable position and write
+``tablebase.bin``. Each position is stored as one 16-bit entry at its base-3
+index (empty=0, X=1, O=2 per cell):
+
+    bits 0-8    optimal moves for the side to move
+    bits 9-12   plies until the game ends under optimal play
+    bits 13-14  value for the side to move (0 unreachable, 1 loss, 2 draw, 3 win)
+
+The entry array is zlib-compressed behind a small header.
+"""
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from engine import CELL_BITS, FULL, is_win
+
+MAGIC = b'TTTB'
+VERSION = 1
+SIZE = 3 ** 9
+UNKNOWN, LOSS, DRAW, WIN = 0, 1, 2, 3
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebase.bin')
+
+# TERNARY[bits] is the base-3 index contribution of a set of cells holding 1.
+TERNARY = tuple(sum(3 ** i for i in range(9) if bits >> i & 1) for bits in range(1 << 9))
+
+
+def index(x, o):
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def pack(value, distance, moves):
+    return value << 13 | distance << 9 | moves
+
+
+def unpack(entry):
+    return entry >> 13, entry >> 9 & 0xF, entry & FULL
+
+
+def reachable_positions():
+    """Every legal position grouped by ply, X moving first."""
+    layers = [{(0, 0)}]
+    for ply in range(9):
+        nxt = set()
+        for x, o in layers[ply]:
+            if is_win(x) or is_win(o): continue
+            occupied = x | o
+            for bit in CELL_BITS:
+                if occupied & bit: continue
+                nxt.add((x | bit, o) if ply % 2 == 0 else (x, o | bit))
+        layers.append(nxt)
+    return layers
+
+
+def solve():
+    """Backward induction from the last ply to the empty board."""
+    table = array('H', bytes(2 * SIZE))
+    layers = reachable_positions()
+    for ply in range(9, -1, -1):
+        x_to_move = ply % 2 == 0
+        for x, o in layers[ply]:
+            if is_win(o if x_to_move else x):
+                table[index(x, o)] = pack(LOSS, 0, 0)
+                continue
+            occupied = x | o
+            if occupied == FULL:
+                table[index(x, o)] = pack(DRAW, 0, 0)
+                continue
+            best, moves = None, 0
+            for cell, bit in enumerate(CELL_BITS):
+                if occupied & bit: continue
+                child = index(x | bit, o) if x_to_move else index(x, o | bit)
+                value, distance, _ = unpack(table[child])
+                # Rank outcomes: faster wins first, then draws, then slower losses.
+                mine = 4 - value
+                rank = (mine, -distance if mine == WIN else distance if mine == LOSS else 0)
+                if best is None or rank > best[0]:
+                    best, moves = (rank, mine, distance + 1), 1 << cell
+                elif rank == best[0]:
+                    moves |= 1 << cell
+            table[index(x, o)] = pack(best[1], best[2], moves)
+    return table
+
+
+def write(path=DEFAULT_PATH):
+    table = solve()
+    count = sum(1 for entry in table if entry)
+    if sys.byteorder == 'big': table.byteswap()
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<BI', VERSION, SIZE) + zlib.compress(table.tobytes(), 9))
+    return count
+
+
+class Tablebase:
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            blob = f.read()
+        header = len(MAGIC) + struct.calcsize('<BI')
+        version, size = struct.unpack('<BI', blob[len(MAGIC):header])
+        if blob[:len(MAGIC)] != MAGIC or version != VERSION or size != SIZE:
+            raise ValueError(f"{path} is not a version {VERSION} tablebase")
+        table = array('H', zlib.decompress(blob[header:]))
+        if sys.byteorder == 'big': table.byteswap()
+        return cls(table)
+
+    def probe(self, x, o):
+        """(value, distance, moves) for the side to move, or None if unreachable."""
+        entry = self.table[index(x, o)]
+        return unpack(entry) if entry else None
+
+    def best_move(self, x, o):
+        """Lowest-numbered optimal cell, or None when there is nothing to play."""
+        entry = self.table[index(x, o)]
+        moves = entry & FULL
+        if not moves: return None
+        return (moves & -moves).bit_length() - 1
+
+
+_loaded = None
+
+
+def get_tablebase(path=DEFAULT_PATH):
+    """Load the shipped tablebase once; None if the file is missing or corrupt."""
+    global _loaded
+    if _loaded is None:
+        try:
+            _loaded = Tablebase.load(path)
+        except (OSError, ValueError, zlib.error):
+            _loaded = False
+    return _loaded or None
+
+
+if __name__ == '__main__':
+    count = write()
+    print(f"Wrote {count} positions to {DEFAULT_PATH} ({os.path.getsize(DEFAULT_PATH)} bytes)")